@@ -0,0 +1,187 @@
+"""Benchmarks of the status latency and log throughput.
+
+Results are written as JSON, and can be compared with the results of a
+previous run with --baseline. Run through nox with `nox -s benchmarks`.
+"""
+import sys
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+from json import dump as json_dump
+from json import load as json_load
+from os import environ
+from pathlib import Path
+from platform import python_version
+from statistics import mean, median
+from subprocess import DEVNULL, CalledProcessError, run
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable
+
+_DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+_XDG_VARIABLES = [
+    "XDG_CACHE_HOME",
+    "XDG_CONFIG_HOME",
+    "XDG_DATA_HOME",
+    "XDG_RUNTIME_DIR",
+]
+
+
+def _measure(function: Callable[[], Any], repeat: int) -> dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        timings.append(perf_counter() - start)
+
+    return {"min": min(timings), "median": median(timings), "mean": mean(timings)}
+
+
+def _run_cli(*arguments: str) -> None:
+    run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; sys.argv = ['jean-travail', *{list(arguments)}];"
+            + "from jtravail.status import main; main()",
+        ],
+        check=True,
+        stdout=DEVNULL,
+    )
+
+
+def bench_cold_start(repeat: int) -> dict[str, Any]:
+    _run_cli("stop")
+    idle_status = _measure(lambda: _run_cli("status"), repeat)
+    next_ = _measure(lambda: _run_cli("next"), repeat)
+    running_status = _measure(lambda: _run_cli("status"), repeat)
+    _run_cli("stop")
+
+    return {
+        "status_idle": idle_status,
+        "status_running": running_status,
+        "next": next_,
+    }
+
+
+def bench_state_round_trip(repeat: int) -> dict[str, Any]:
+    from jtravail.pomodoro import Pomodoro
+
+    pomodoro = Pomodoro()
+    pomodoro.next()
+
+    def _round_trip() -> None:
+        for _ in range(1000):
+            pomodoro._save()
+            pomodoro._refresh()
+
+    timings = _measure(_round_trip, repeat)
+    pomodoro.stop()
+    return {key: value / 1000 for key, value in timings.items()}
+
+
+def _generate_log(path: Path, size: int) -> datetime:
+    from jtravail.log import LOG_HEADER_V2
+
+    start = datetime(2000, 1, 1)
+    offset = int(start.astimezone().utcoffset().total_seconds())  # type: ignore
+    timestamp = int(start.timestamp())
+
+    with path.open("wb") as log_file:
+        log_file.write(LOG_HEADER_V2)
+        lines = []
+        for index in range(size):
+            type_ = "work" if index % 2 == 0 else "pause"
+            duration = 25 * 60 if index % 2 == 0 else 5 * 60
+            lines.append(f"{timestamp};{timestamp + duration};{type_};{offset}\n")
+            timestamp += duration + 60
+            if len(lines) == 100_000:
+                log_file.write("".join(lines).encode())
+                lines.clear()
+        log_file.write("".join(lines).encode())
+
+    return datetime.fromtimestamp(timestamp)
+
+
+def bench_log_throughput(directory: Path, size: int, repeat: int) -> dict[str, Any]:
+    from jtravail.pomodoro import Pomodoro
+    from jtravail.storage import TextLog
+
+    log_path = directory / f"log-{size}.db"
+    end = _generate_log(log_path, size)
+    pomodoro = Pomodoro(log=TextLog(log_path, directory / f"rollup-{size}.json"))
+
+    def _scan(since: datetime | None = None) -> int:
+        with pomodoro.get_log(since=since) as entries:
+            return sum(1 for _ in entries)
+
+    full_scan = _measure(_scan, repeat)
+    last_day = _measure(lambda: _scan(end - timedelta(days=1)), repeat)
+    log_path.unlink()
+
+    return {
+        "full_scan": {
+            **full_scan,
+            "entries_per_second": size / full_scan["median"],
+        },
+        "last_day": last_day,
+    }
+
+
+def _get_revision() -> str | None:
+    try:
+        result = run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        )
+    except (OSError, CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _compare(results: Any, baseline: Any, path: str = "") -> None:
+    if isinstance(results, dict):
+        for key, value in results.items():
+            if key in baseline:
+                _compare(value, baseline[key], f"{path}.{key}" if path else key)
+        return
+
+    if path.endswith(".median") and baseline:
+        print(f"{path}: {results / baseline - 1:+.1%}")
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("-o", "--output", type=Path, default=Path("benchmarks.json"))
+    parser.add_argument("-b", "--baseline", type=Path)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=_DEFAULT_SIZES)
+    arguments = parser.parse_args()
+
+    with TemporaryDirectory() as directory:
+        # Isolate the benchmarks from the user state and log. jtravail reads
+        # these variables when imported, so it's only imported afterwards.
+        for name in _XDG_VARIABLES:
+            environ[name] = str(Path(directory) / name.lower())
+            Path(environ[name]).mkdir()
+
+        results = {
+            "revision": _get_revision(),
+            "python": python_version(),
+            "date": datetime.now().isoformat(),
+            "cold_start": bench_cold_start(arguments.repeat),
+            "state_round_trip": bench_state_round_trip(arguments.repeat),
+            "log_throughput": {
+                str(size): bench_log_throughput(Path(directory), size, arguments.repeat)
+                for size in arguments.sizes
+            },
+        }
+
+    with arguments.output.open("w") as output_file:
+        json_dump(results, output_file, indent=2)
+
+    if arguments.baseline is not None:
+        with arguments.baseline.open("r") as baseline_file:
+            _compare(results, json_load(baseline_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from time import perf_counter
+
+# Traced as the start of the imports phase, see jtravail.trace
+IMPORT_START = perf_counter()
@@ -1,20 +1,90 @@
-from configparser import ConfigParser
+from contextlib import ExitStack
+from datetime import datetime
 from functools import wraps
 from gettext import gettext as _
+from os import cpu_count, environ
 from pathlib import Path
-from typing import Any, Callable
+from shlex import split
+from signal import SIGTERM, signal
+from subprocess import Popen
+from time import sleep, time
+from types import FrameType
+from typing import Any, Callable, Iterable, Iterator, TextIO
 
-from appdirs import user_config_dir
-from click import Command, Context, Option
+from click import (
+    BadParameter,
+    Choice,
+    ClickException,
+    Command,
+    Context,
+    DateTime,
+    File,
+    IntRange,
+    Option,
+)
 from click import Path as ClickPath
-from click import echo, group, option, pass_context, pass_obj
+from click import (
+    argument,
+    echo,
+    get_current_context,
+    group,
+    option,
+    pass_context,
+    pass_obj,
+)
 from click.core import ParameterSource  # type: ignore
 
-from jtravail.pomodoro import Pomodoro
-
-_APP_NAME = "jean-travail"
-_APP_AUTHOR = "ottorg"
-DEFAULT_CONFIG_FILE = Path(user_config_dir(_APP_NAME, _APP_AUTHOR)) / "config.cfg"
+from jtravail.daemon import (
+    DEFAULT_SOCKET_FILE,
+    Daemon,
+    DaemonError,
+    DaemonPomodoro,
+    connect,
+    is_daemon_running,
+)
+from jtravail.export import EXPORT_FORMATS
+from jtravail.hooks import DEFAULT_HOOK_TIMEOUT, HOOK_OPTIONS, TransitionHooks
+from jtravail.log import LogEntryV2, LogError, read_header, read_log, write_log_v2
+from jtravail.merge import merge_logs
+from jtravail.metrics import Metrics
+from jtravail.pomodoro import (
+    DEFAULT_LOG_FILE,
+    DEFAULT_ROLLUP_FILE,
+    DEFAULT_STATE_FILE,
+    Pomodoro,
+)
+from jtravail.prompt import PromptStatus
+from jtravail.report import build_report
+from jtravail.segments import DEFAULT_SEGMENTS_DIR, SegmentedLog
+from jtravail.snapshot import Snapshot, SnapshotState
+from jtravail.sqlite import DEFAULT_SQLITE_FILE, SqliteLog
+from jtravail.stats import PERIODS, group_stats
+from jtravail.status import (
+    DEFAULT_CONFIG_FILE,
+    DEFAULT_FORMAT,
+    DEFAULT_HISTORY_FORMAT,
+    DEFAULT_LONG_PAUSE_DURATION,
+    DEFAULT_LONG_PAUSE_PERIOD,
+    DEFAULT_PAUSE_DURATION,
+    DEFAULT_STATS_FORMAT,
+    DEFAULT_WORK_DURATION,
+    FormatError,
+    StatusFormat,
+    get_option,
+    get_status_name,
+    render_log_entry,
+    render_stats,
+)
+from jtravail.storage import (
+    BatchedLog,
+    BatchedState,
+    LogStore,
+    StateError,
+    TextLog,
+    lock_log,
+)
+from jtravail.timers import Timers
+from jtravail.trace import is_tracing, start_trace, stop_trace, trace
 
 
 class ConfigOption(Option):
@@ -23,9 +93,20 @@ class ConfigOption(Option):
 
 class ConfigCommand(Command):
     def invoke(self, context: Context) -> Any:
-        config_file_path = context.params.get("config", DEFAULT_CONFIG_FILE)
-        config = ConfigParser()
-        config.read(config_file_path)
+        with trace("config"):
+            self._resolve_config(context)
+
+        with trace("command"):
+            return super().invoke(context)
+
+    def _resolve_config(self, context: Context) -> None:
+        snapshot = context.meta.get("jtravail.snapshot")
+        config_file_path = context.params.get("config")
+        if snapshot is None or config_file_path is not None:
+            snapshot = Snapshot(
+                DEFAULT_STATE_FILE, Path(config_file_path or DEFAULT_CONFIG_FILE)
+            )
+        config = snapshot.get_config()
         for parameter in self.params:
             if not isinstance(parameter, ConfigOption):
                 continue
@@ -35,55 +116,71 @@ class ConfigCommand(Command):
             if context.get_parameter_source(name) is not ParameterSource.DEFAULT:  # type: ignore
                 continue
 
-            config_value = config.get("options", name.strip("_"), fallback=None)
+            config_value = config.get(name.strip("_"))
             if config_value is None:
                 continue
 
             context.params[name] = parameter.type(config_value)
 
-        return super().invoke(context)
+
+# Pomodoros to render at each tick of a status command, or None to render the
+# current one.
+_Tick = list[tuple[str, Pomodoro]] | None
+
+
+_work_duration_option = option(
+    "-w",
+    "--work-duration",
+    cls=ConfigOption,
+    type=int,
+    default=DEFAULT_WORK_DURATION,
+    envvar="JTRAVAIL_WORK_DURATION",
+    help=_("Work session duration in minutes"),
+    show_default=True,
+)
+_pause_duration_option = option(
+    "-p",
+    "--pause-duration",
+    cls=ConfigOption,
+    type=int,
+    default=DEFAULT_PAUSE_DURATION,
+    envvar="JTRAVAIL_PAUSE_DURATION",
+    help=_("Pause duration in minutes"),
+    show_default=True,
+)
+_long_pause_duration_option = option(
+    "-l",
+    "--long-pause-duration",
+    cls=ConfigOption,
+    type=int,
+    default=DEFAULT_LONG_PAUSE_DURATION,
+    envvar="JTRAVAIL_LONG_PAUSE_DURATION",
+    help=_("Long pause duration in minutes"),
+    show_default=True,
+)
+
+
+def _set_prompt_durations(
+    work_duration: int, pause_duration: int, long_pause_duration: int
+) -> None:
+    # The prompt file is written on transitions, with the durations of the
+    # command rather than the configured ones.
+    prompt_status = get_current_context().meta.get("jtravail.prompt_status")
+    if prompt_status is not None:
+        prompt_status.set_durations(work_duration, pause_duration, long_pause_duration)
 
 
-def print_status(
-    command: Callable[[Pomodoro], None]
-) -> Callable[[Pomodoro, int, int, int, int, str], None]:
+def print_status(command: Callable[..., Iterable[_Tick] | None]) -> Callable[..., None]:
     @wraps(command)
-    @option(
-        "-w",
-        "--work-duration",
-        cls=ConfigOption,
-        type=int,
-        default=25,
-        envvar="JTRAVAIL_WORK_DURATION",
-        help=_("Work session duration in minutes"),
-        show_default=True,
-    )
-    @option(
-        "-p",
-        "--pause-duration",
-        cls=ConfigOption,
-        type=int,
-        default=5,
-        envvar="JTRAVAIL_PAUSE_DURATION",
-        help=_("Pause duration in minutes"),
-        show_default=True,
-    )
-    @option(
-        "-l",
-        "--long-pause-duration",
-        cls=ConfigOption,
-        type=int,
-        default=15,
-        envvar="JTRAVAIL_LONG_PAUSE_DURATION",
-        help=_("Long pause duration in minutes"),
-        show_default=True,
-    )
+    @_work_duration_option
+    @_pause_duration_option
+    @_long_pause_duration_option
     @option(
         "-P",
         "--long-pause-period",
         cls=ConfigOption,
         type=int,
-        default=4,
+        default=DEFAULT_LONG_PAUSE_PERIOD,
         envvar="JTRAVAIL_LONG_PAUSE_PERIOD",
         help=_("Number of work sessions between two long pauses"),
         show_default=True,
@@ -94,7 +191,7 @@ def print_status(
         "format_",
         cls=ConfigOption,
         type=str,
-        default="{iteration}/{long_pause_period} {status}: {remaining_sign}{minutes:02d}:{seconds:02d}",
+        default=DEFAULT_FORMAT,
         envvar="JTRAVAIL_STATUS_FORMAT",
         help=_("Status output format. See documentation for available variables."),
         show_default=True,
@@ -106,44 +203,102 @@ def print_status(
         long_pause_period: int,
         long_pause_duration: int,
         format_: str,
+        **kwargs: Any,
     ) -> None:
-        command(pomodoro)
-        if pomodoro.idle:
-            status_name = _("Idle")
-        elif pomodoro.work:
-            status_name = _("Work")
-        elif pomodoro.pause:
-            status_name = _("Pause")
-        elif pomodoro.long_pause:
-            status_name = _("Long Pause")
-        else:
-            assert False
+        try:
+            status_format = StatusFormat(format_)
+        except FormatError as ex:
+            raise BadParameter(str(ex), param_hint="'--format'")
+
+        _set_prompt_durations(work_duration, pause_duration, long_pause_duration)
+        try:
+            ticks = command(pomodoro, **kwargs)
+        except DaemonError as ex:
+            raise ClickException(str(ex))
+        if ticks is None:
+            ticks = [None]
+
+        for tick in ticks:
+            with trace("render"):
+                if tick is None:
+                    tick = [("", pomodoro)]
+                status_lines = [
+                    (f"{name}: " if name else "")
+                    + status_format.render(
+                        timer,
+                        work_duration=work_duration,
+                        pause_duration=pause_duration,
+                        long_pause_period=long_pause_period,
+                        long_pause_duration=long_pause_duration,
+                    )
+                    for name, timer in tick
+                ]
+            for status_line in status_lines:
+                echo(status_line)
+
+    return _wrapper
 
-        remaining_time = pomodoro.get_remaining_time(
-            work_duration=work_duration,
-            pause_duration=pause_duration,
-            long_pause_duration=long_pause_duration,
-        )
 
-        total_seconds = int(remaining_time.total_seconds())
-        remaining_sign = "-" if total_seconds < 0 else ""
-        minutes = int(total_seconds / 60)
-        seconds = abs(total_seconds - 60 * minutes)
-        minutes = abs(minutes)
+def _get_log(log_backend: str) -> LogStore | None:
+    if log_backend == "sqlite":
+        return SqliteLog()
+    if log_backend == "segmented":
+        return SegmentedLog()
+    return None
 
+
+def _get_hooks(config: dict[str, str]) -> TransitionHooks | None:
+    commands = {
+        status: get_option(config, name, "") for status, name in HOOK_OPTIONS.items()
+    }
+    commands = {status: command for status, command in commands.items() if command}
+    if not commands:
+        return None
+
+    try:
+        timeout = get_option(config, "hook_timeout", DEFAULT_HOOK_TIMEOUT)
+    except ValueError as ex:
+        raise ClickException(_("Invalid hook timeout: %s") % ex)
+    return TransitionHooks(commands, timeout)
+
+
+def _start_batch(
+    context: Context,
+    log: LogStore | None,
+    snapshot: Snapshot,
+    hooks: TransitionHooks | None,
+    prompt_status: PromptStatus,
+) -> Pomodoro:
+    # Batches run locally, holding the state lock so that changes written at
+    # checkpoints don't overwrite the ones of other processes. The daemon would
+    # wait for the lock, blocking all its clients until the batch ends.
+    if is_daemon_running():
+        raise ClickException(_("Batches can't run while the daemon is running"))
+
+    state = SnapshotState(DEFAULT_STATE_FILE, snapshot)
+    context.with_resource(state.lock())  # type: ignore
+    try:
+        batched_state = BatchedState(state)
+    except StateError as ex:
         echo(
-            format_.format(
-                status=status_name,
-                minutes=minutes,
-                seconds=seconds,
-                total_seconds=total_seconds,
-                iteration=pomodoro.iteration,
-                long_pause_period=long_pause_period,
-                remaining_sign=remaining_sign,
-            )
+            _("Error while loading state file %s: %s. State was reset.") % (state, ex),
+            err=True,
         )
+        state.clear()
+        batched_state = BatchedState(state)
 
-    return _wrapper
+    pomodoro = Pomodoro(
+        BatchedLog(log or TextLog(DEFAULT_LOG_FILE, DEFAULT_ROLLUP_FILE)),
+        batched_state,
+        hooks,
+    )
+
+    def _checkpoint() -> None:
+        pomodoro.flush()
+        prompt_status(pomodoro)
+
+    context.meta["jtravail.checkpoint"] = _checkpoint
+    return pomodoro
 
 
 @group()
@@ -155,8 +310,83 @@ def print_status(
     show_default=str(DEFAULT_CONFIG_FILE),
     help=_("Path to configuration file"),
 )
-def main(context: Context, config: Path) -> None:
-    context.obj = Pomodoro()
+@option(
+    "-b",
+    "--log-backend",
+    type=Choice(["text", "sqlite", "segmented"]),
+    default="text",
+    envvar="JTRAVAIL_LOG_BACKEND",
+    help=_("Storage backend of the session log"),
+    show_default=True,
+)
+@option(
+    "-t",
+    "--timer",
+    envvar="JTRAVAIL_TIMER",
+    help=_("Name of the timer to use instead of the default one"),
+)
+@option(
+    "--trace",
+    "trace_stderr",
+    is_flag=True,
+    envvar="JTRAVAIL_TRACE",
+    help=_("Print phase timings to stderr"),
+)
+@option(
+    "--trace-file",
+    type=ClickPath(dir_okay=False),
+    envvar="JTRAVAIL_TRACE_FILE",
+    help=_("Write phase timings to the given file, in Chrome trace event format"),
+)
+@option(
+    "--profile",
+    "profile_path",
+    type=ClickPath(dir_okay=False),
+    envvar="JTRAVAIL_PROFILE",
+    help=_("Dump cProfile statistics to the given file"),
+)
+def main(
+    context: Context,
+    config: str | None,
+    log_backend: str,
+    timer: str | None,
+    trace_stderr: bool,
+    trace_file: str | None,
+    profile_path: str | None,
+) -> None:
+    if not is_tracing() and (trace_stderr or trace_file or profile_path):
+        start_trace("-" if trace_stderr else trace_file, profile_path)
+        context.call_on_close(stop_trace)
+
+    log = _get_log(log_backend)
+    snapshot = Snapshot(DEFAULT_STATE_FILE, Path(config or DEFAULT_CONFIG_FILE))
+    hooks = _get_hooks(snapshot.get_config())
+    timers = Timers(log=log, hooks=hooks)
+    # Only the default timer is shown in shell prompts. Durations are set by
+    # the command, once its options are resolved.
+    prompt_status = PromptStatus(
+        DEFAULT_WORK_DURATION, DEFAULT_PAUSE_DURATION, DEFAULT_LONG_PAUSE_DURATION
+    )
+    context.meta["jtravail.snapshot"] = snapshot
+    context.meta["jtravail.timers"] = timers
+    context.meta["jtravail.prompt_status"] = prompt_status
+
+    if context.invoked_subcommand == "batch":
+        if timer is not None:
+            raise ClickException(_("Batches can't run against named timers"))
+        context.obj = _start_batch(context, log, snapshot, hooks, prompt_status)
+        return
+
+    if timer is not None:
+        context.obj = timers.get(timer)
+        return
+
+    context.obj = connect(
+        log=log,
+        state=SnapshotState(DEFAULT_STATE_FILE, snapshot),
+        on_transition=hooks,
+        on_save=prompt_status,
+    )
 
 
 @main.command(cls=ConfigCommand)
@@ -168,9 +398,73 @@ def next(pomodoro: Pomodoro) -> None:
 
 @main.command(cls=ConfigCommand)
 @pass_obj
+@argument("commands", type=File("r"), default="-")
 @print_status
-def status(pomodoro: Pomodoro) -> None:
-    pass
+def batch(pomodoro: Pomodoro, commands: TextIO) -> Iterator[_Tick]:
+    checkpoint = get_current_context().meta["jtravail.checkpoint"]
+    for line_number, line in enumerate(commands, 1):
+        try:
+            command = split(line, comments=True)
+        except ValueError as ex:
+            raise ClickException(_("Line %d: %s") % (line_number, ex))
+
+        if not command:
+            continue
+        if command == ["next"]:
+            pomodoro.next()
+        elif command == ["stop"]:
+            pomodoro.stop()
+        elif command == ["status"]:
+            yield None
+        elif command == ["checkpoint"]:
+            checkpoint()
+        else:
+            raise ClickException(
+                _('Line %d: unknown command "%s"') % (line_number, " ".join(command))
+            )
+
+    checkpoint()
+
+
+def _follow(get_tick: Callable[[], _Tick]) -> Iterator[_Tick]:
+    try:
+        while True:
+            yield get_tick()
+            sleep(1 - time() % 1)
+    except KeyboardInterrupt:
+        return
+
+
+@main.command(cls=ConfigCommand)
+@pass_obj
+@option(
+    "-F",
+    "--follow",
+    is_flag=True,
+    help=_("Keep running and print the status at every second"),
+)
+@option(
+    "-a",
+    "--all",
+    "all_",
+    is_flag=True,
+    help=_("Print the status of every named timer"),
+)
+@print_status
+def status(pomodoro: Pomodoro, follow: bool, all_: bool) -> Iterable[_Tick] | None:
+    get_tick: Callable[[], _Tick]
+    if all_:
+        get_tick = get_current_context().meta["jtravail.timers"].get_all
+    else:
+
+        def get_tick() -> None:
+            pomodoro.reload()
+
+    if follow:
+        return _follow(get_tick)
+    if all_:
+        return [get_tick()]
+    return None
 
 
 @main.command()
@@ -178,3 +472,388 @@ def status(pomodoro: Pomodoro) -> None:
 @print_status
 def stop(pomodoro: Pomodoro) -> None:
     pomodoro.stop()
+
+
+@main.command(cls=ConfigCommand)
+@pass_obj
+@option(
+    "-n",
+    "--last",
+    type=IntRange(min=0),
+    default=10,
+    help=_("Number of sessions to show"),
+    show_default=True,
+)
+@option(
+    "-f",
+    "--format",
+    "history_format",
+    cls=ConfigOption,
+    type=str,
+    default=DEFAULT_HISTORY_FORMAT,
+    envvar="JTRAVAIL_HISTORY_FORMAT",
+    help=_("Session output format. See documentation for available variables."),
+    show_default=True,
+)
+def history(pomodoro: Pomodoro, last: int, history_format: str) -> None:
+    for entry in pomodoro.get_last_log(last):
+        echo(render_log_entry(entry, history_format))
+
+
+@main.command(cls=ConfigCommand)
+@pass_obj
+@option(
+    "-p",
+    "--period",
+    type=Choice(list(PERIODS)),
+    default="day",
+    help=_("Period over which sessions are aggregated"),
+    show_default=True,
+)
+@option(
+    "-n",
+    "--last",
+    type=IntRange(min=0),
+    default=7,
+    help=_("Number of periods to show"),
+    show_default=True,
+)
+@option(
+    "-f",
+    "--format",
+    "stats_format",
+    cls=ConfigOption,
+    type=str,
+    default=DEFAULT_STATS_FORMAT,
+    envvar="JTRAVAIL_STATS_FORMAT",
+    help=_("Statistics output format. See documentation for available variables."),
+    show_default=True,
+)
+def stats(pomodoro: Pomodoro, period: str, last: int, stats_format: str) -> None:
+    groups = list(group_stats(pomodoro.get_stats(), period).items())
+    del groups[: max(len(groups) - last, 0)]
+    for key, period_stats in groups:
+        echo(render_stats(key, period_stats, stats_format))
+
+
+@main.command(cls=ConfigCommand)
+@argument(
+    "logs",
+    nargs=-1,
+    type=ClickPath(dir_okay=False, exists=True),
+)
+@option(
+    "-j",
+    "--jobs",
+    type=int,
+    default=cpu_count() or 1,
+    help=_("Number of worker processes used to scan big logs"),
+    show_default=True,
+)
+@option(
+    "-p",
+    "--period",
+    type=Choice(list(PERIODS)),
+    default="day",
+    help=_("Period over which sessions are aggregated"),
+    show_default=True,
+)
+@option(
+    "-f",
+    "--format",
+    "stats_format",
+    cls=ConfigOption,
+    type=str,
+    default=DEFAULT_STATS_FORMAT,
+    envvar="JTRAVAIL_STATS_FORMAT",
+    help=_("Statistics output format. See documentation for available variables."),
+    show_default=True,
+)
+def report(logs: tuple[str, ...], jobs: int, period: str, stats_format: str) -> None:
+    paths = [Path(log) for log in logs] or [DEFAULT_LOG_FILE]
+    paths = [path for path in paths if path.exists()]
+    for key, period_stats in group_stats(build_report(paths, jobs), period).items():
+        echo(render_stats(key, period_stats, stats_format))
+
+
+@main.command()
+@pass_obj
+@option(
+    "-F",
+    "--format",
+    "export_format",
+    type=Choice(list(EXPORT_FORMATS)),
+    default="jsonl",
+    help=_("Output format"),
+    show_default=True,
+)
+@option(
+    "-s",
+    "--since",
+    type=DateTime(),
+    help=_("Only export sessions ending after this date"),
+)
+@option(
+    "-u",
+    "--until",
+    type=DateTime(),
+    help=_("Only export sessions starting before this date"),
+)
+@option(
+    "-o",
+    "--output",
+    type=File("w", lazy=True),
+    default="-",
+    help=_("File to write to, standard output by default"),
+)
+def export(
+    pomodoro: Pomodoro,
+    export_format: str,
+    since: datetime | None,
+    until: datetime | None,
+    output: TextIO,
+) -> None:
+    with pomodoro.get_log(since=since, until=until) as entries:
+        EXPORT_FORMATS[export_format](entries, output)
+
+
+def _notify_phase_end(name: str, pomodoro: Pomodoro) -> None:
+    echo((f"{name}: " if name else "") + _("%s ended") % get_status_name(pomodoro))
+
+
+def _get_command_hook(command: str) -> Callable[[str, Pomodoro], None]:
+    def _run_command(name: str, pomodoro: Pomodoro) -> None:
+        # Not waited for, so that a slow command doesn't delay other timers
+        Popen(
+            command,
+            shell=True,
+            env={**environ, "JTRAVAIL_TIMER": name, "JTRAVAIL_STATUS": pomodoro.status},
+        )
+
+    return _run_command
+
+
+@main.command(cls=ConfigCommand)
+@pass_context
+@option(
+    "-s",
+    "--socket",
+    "socket_path",
+    type=ClickPath(dir_okay=False),
+    default=str(DEFAULT_SOCKET_FILE),
+    help=_("Path of the Unix socket to listen on"),
+    show_default=True,
+)
+@option(
+    "-e",
+    "--on-phase-end",
+    cls=ConfigOption,
+    help=_("Shell command to run when a phase ends"),
+)
+@option(
+    "-m",
+    "--metrics-port",
+    cls=ConfigOption,
+    type=int,
+    envvar="JTRAVAIL_METRICS_PORT",
+    help=_("Serve Prometheus metrics over HTTP on the given local port"),
+)
+@_work_duration_option
+@_pause_duration_option
+@_long_pause_duration_option
+def daemon(
+    context: Context,
+    socket_path: str,
+    on_phase_end: str | None,
+    metrics_port: int | None,
+    work_duration: int,
+    pause_duration: int,
+    long_pause_duration: int,
+) -> None:
+    pomodoro = context.obj
+    if isinstance(pomodoro, DaemonPomodoro):
+        raise ClickException(_("A daemon is already running"))
+
+    # Imported here, as asyncio is slow to import and is only needed by the
+    # daemon.
+    from jtravail.scheduler import PhaseScheduler
+
+    hooks: list[Callable[[str, Pomodoro], None]] = [_notify_phase_end]
+    if on_phase_end:
+        hooks.append(_get_command_hook(on_phase_end))
+    scheduler = PhaseScheduler(
+        hooks,
+        work_duration=work_duration,
+        pause_duration=pause_duration,
+        long_pause_duration=long_pause_duration,
+    )
+
+    def _interrupt(signal_number: int, frame: FrameType | None) -> None:
+        raise KeyboardInterrupt()
+
+    # The prompt file may have been lost, the runtime directory being
+    # cleared at each boot.
+    prompt_status = context.meta["jtravail.prompt_status"]
+    prompt_status.set_durations(work_duration, pause_duration, long_pause_duration)
+    prompt_status(pomodoro)
+
+    metrics = None
+    if metrics_port is not None:
+        metrics = Metrics(
+            pomodoro,
+            work_duration=work_duration,
+            pause_duration=pause_duration,
+            long_pause_duration=long_pause_duration,
+        )
+
+    signal(SIGTERM, _interrupt)
+    try:
+        Daemon(pomodoro, metrics).serve(
+            Path(socket_path),
+            scheduler,
+            context.meta["jtravail.timers"],
+            metrics_port,
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+@main.command()
+@option(
+    "-s",
+    "--source",
+    type=ClickPath(dir_okay=False, exists=True),
+    default=str(DEFAULT_LOG_FILE),
+    help=_("Text log to import"),
+    show_default=True,
+)
+@option(
+    "-d",
+    "--destination",
+    type=ClickPath(dir_okay=False),
+    default=str(DEFAULT_SQLITE_FILE),
+    help=_("SQLite database to import sessions into"),
+    show_default=True,
+)
+def migrate(source: str, destination: str) -> None:
+    log = SqliteLog(Path(destination))
+    if log.count():
+        raise ClickException(_("%s already contains sessions") % destination)
+
+    with Path(source).open("rb") as source_log:
+        log.extend(read_log(source_log))
+    count = log.count()
+
+    echo(_("Imported %d sessions into %s") % (count, destination))
+
+
+@main.command(name="migrate-segments")
+@option(
+    "-s",
+    "--source",
+    type=ClickPath(dir_okay=False, exists=True),
+    default=str(DEFAULT_LOG_FILE),
+    help=_("Text log to import"),
+    show_default=True,
+)
+@option(
+    "-d",
+    "--destination",
+    type=ClickPath(file_okay=False),
+    default=str(DEFAULT_SEGMENTS_DIR),
+    help=_("Segments directory to import sessions into"),
+    show_default=True,
+)
+def migrate_segments(source: str, destination: str) -> None:
+    log = SegmentedLog(Path(destination))
+    if log.count():
+        raise ClickException(_("%s already contains sessions") % destination)
+
+    with Path(source).open("rb") as source_log:
+        log.extend(read_log(source_log))
+    count = log.count()
+
+    echo(_("Imported %d sessions into %s") % (count, destination))
+
+
+def _get_log_paths(paths: Iterable[Path]) -> Iterator[Path]:
+    for path in paths:
+        if not path.is_dir():
+            yield path
+            continue
+
+        for child in sorted(path.iterdir()):
+            if child.is_file() and not child.name.startswith(".") and _is_log(child):
+                yield child
+
+
+def _is_log(path: Path) -> bool:
+    # Data directories also hold lock files, rollups and databases, which are
+    # told apart from logs by their first entry.
+    try:
+        with path.open("rb") as log:
+            for entry in read_log(log):
+                return entry.start <= entry.end and bool(entry.type)
+    except (LogError, ValueError, IndexError):
+        pass
+    return False
+
+
+@main.command()
+@argument("logs", nargs=-1, required=True, type=ClickPath(exists=True))
+@option(
+    "-o",
+    "--output",
+    type=ClickPath(dir_okay=False),
+    required=True,
+    help=_("Path of the merged log, which can be one of the merged logs"),
+)
+def merge(logs: tuple[str, ...], output: str) -> None:
+    paths = list(_get_log_paths(Path(log) for log in logs))
+    output_path = Path(output)
+    temporary_path = output_path.with_name(f"{output_path.name}.tmp")
+    # Sessions appended to the output during the merge would be lost
+    with lock_log(output_path):
+        try:
+            with ExitStack() as stack:
+                inputs = [
+                    read_log(stack.enter_context(path.open("rb"))) for path in paths
+                ]
+                with temporary_path.open("w") as output_log:
+                    count = write_log_v2(merge_logs(inputs), output_log)
+        except (LogError, ValueError, IndexError) as ex:
+            temporary_path.unlink(missing_ok=True)
+            raise ClickException(_("Can't merge logs: %s") % ex)
+
+        temporary_path.replace(output_path)
+    echo(_("Merged %d sessions from %d logs") % (count, len(paths)))
+
+
+@main.command(name="migrate-log")
+@option(
+    "-s",
+    "--source",
+    type=ClickPath(dir_okay=False, exists=True),
+    default=str(DEFAULT_LOG_FILE),
+    help=_("Text log to convert"),
+    show_default=True,
+)
+def migrate_log(source: str) -> None:
+    source_path = Path(source)
+    destination_path = source_path.with_name(f"{source_path.name}.v2")
+    # Sessions appended during the conversion would be lost
+    with lock_log(source_path):
+        try:
+            with source_path.open("rb") as source_log:
+                if read_header(source_log)[0] is LogEntryV2:
+                    echo(_("%s is already in the v2 format") % source)
+                    return
+
+                with destination_path.open("w") as destination_log:
+                    count = write_log_v2(read_log(source_log), destination_log)
+        except (LogError, ValueError, IndexError) as ex:
+            destination_path.unlink(missing_ok=True)
+            raise ClickException(str(ex))
+
+        destination_path.replace(source_path)
+    echo(_("Converted %d sessions to the v2 format") % count)
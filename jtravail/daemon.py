@@ -0,0 +1,254 @@
+from gettext import gettext as _
+from json import dumps as json_dumps
+from json import loads as json_loads
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Hashable
+
+from jtravail.paths import APP_NAME, get_runtime_dir
+from jtravail.pomodoro import Pomodoro
+from jtravail.storage import LogStore, StateError, StateStore
+
+if TYPE_CHECKING:
+    from asyncio import StreamReader, StreamWriter
+
+    from jtravail.metrics import Metrics
+    from jtravail.scheduler import PhaseScheduler
+    from jtravail.timers import Timers
+
+DEFAULT_SOCKET_FILE = get_runtime_dir() / f"{APP_NAME}.sock"
+
+# Seconds to wait for an answer, before falling back to the state file
+DAEMON_TIMEOUT = 1.0
+
+# Metrics are only served locally
+METRICS_HOST = "127.0.0.1"
+
+
+class DaemonError(Exception):
+    pass
+
+
+class Daemon:
+    def __init__(self, pomodoro: Pomodoro, metrics: "Metrics | None" = None) -> None:
+        self._pomodoro = pomodoro
+        self._metrics = metrics
+        self._timer_names: set[str] = set()
+
+    def handle(self, request: str) -> dict[str, Any]:
+        try:
+            command, *arguments = request.split()
+        except ValueError:
+            return {"error": _("Empty request")}
+
+        try:
+            return self._run(command, arguments)
+        except (StateError, OSError) as ex:
+            return {"error": str(ex)}
+
+    def _run(self, command: str, arguments: list[str]) -> dict[str, Any]:
+        if command == "status":
+            self._pomodoro.reload()
+        elif command == "next":
+            try:
+                long_pause_period = int(arguments[0]) if arguments else 4
+                if long_pause_period < 1:
+                    raise ValueError()
+            except ValueError:
+                return {"error": _('Invalid long pause period "%s"') % arguments[0]}
+
+            self._pomodoro.reload()
+            self._pomodoro.next(long_pause_period=long_pause_period)
+        elif command == "stop":
+            self._pomodoro.stop()
+        else:
+            return {"error": _('Unknown command "%s"') % command}
+
+        return self._pomodoro.dump()
+
+    def serve(
+        self,
+        socket_path: Path = DEFAULT_SOCKET_FILE,
+        scheduler: "PhaseScheduler | None" = None,
+        timers: "Timers | None" = None,
+        metrics_port: int | None = None,
+    ) -> None:
+        """Answer requests on a Unix socket until interrupted.
+
+        When a scheduler is given, the end of the current phase of the served
+        pomodoro and of the named timers is notified to its hooks. When a
+        metrics port is given, metrics are served over HTTP on the loopback
+        interface.
+        """
+        # Imported here, as asyncio is slow to import and is only needed when
+        # running the daemon.
+        from asyncio import run
+
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        socket_path.unlink(missing_ok=True)
+        try:
+            run(self._serve(socket_path, scheduler, timers, metrics_port))
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+    async def _serve(
+        self,
+        socket_path: Path,
+        scheduler: "PhaseScheduler | None",
+        timers: "Timers | None",
+        metrics_port: int | None,
+    ) -> None:
+        from asyncio import (
+            StreamReader,
+            StreamWriter,
+            sleep,
+            start_server,
+            start_unix_server,
+        )
+
+        from click import echo
+
+        async def _handle_client(reader: StreamReader, writer: StreamWriter) -> None:
+            request = (await reader.readline()).decode()
+            response = self.handle(request)
+            if scheduler is not None:
+                scheduler.watch("", self._pomodoro)
+            writer.write(json_dumps(response).encode() + b"\n")
+            await writer.drain()
+            writer.close()
+
+        server = await start_unix_server(_handle_client, str(socket_path))
+        if metrics_port is not None:
+            await start_server(self._handle_metrics, METRICS_HOST, metrics_port)
+
+        async with server:
+            if scheduler is None:
+                await server.serve_forever()
+                return
+
+            try:
+                timers_stamp: Hashable = ()
+                while True:
+                    # Catches changes made without going through the daemon.
+                    # Named timers are only listed again when their file
+                    # changes. Errors are only reported, so that they don't
+                    # stop the daemon.
+                    try:
+                        self._pomodoro.reload()
+                        scheduler.watch("", self._pomodoro)
+                        if timers is not None and timers.get_stamp() != timers_stamp:
+                            timers_stamp = timers.get_stamp()
+                            self._watch_timers(scheduler, timers)
+                    except (StateError, OSError) as ex:
+                        echo(_("Error while watching timers: %s") % ex, err=True)
+                    await sleep(1)
+            finally:
+                scheduler.close()
+
+    async def _handle_metrics(
+        self, reader: "StreamReader", writer: "StreamWriter"
+    ) -> None:
+        # Just enough HTTP for scrapers : the headers are skipped and the
+        # connection closed after the response.
+        request_line = (await reader.readline()).decode(errors="replace")
+        while (await reader.readline()).strip():
+            pass
+
+        if self._metrics is not None and request_line.split()[:2] == [
+            "GET",
+            "/metrics",
+        ]:
+            status = "200 OK"
+            body = self._metrics.render().encode()
+        else:
+            status = "404 Not Found"
+            body = b""
+
+        writer.write(
+            f"HTTP/1.0 {status}\r\n".encode()
+            + b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+        writer.close()
+
+    def _watch_timers(self, scheduler: "PhaseScheduler", timers: "Timers") -> None:
+        named_timers = dict(timers.get_all())
+        for name in self._timer_names - named_timers.keys():
+            scheduler.unwatch(name)
+        for name, pomodoro in named_timers.items():
+            scheduler.watch(name, pomodoro)
+        self._timer_names = set(named_timers)
+
+
+class DaemonPomodoro(Pomodoro):
+    def __init__(
+        self,
+        socket_path: Path = DEFAULT_SOCKET_FILE,
+        log: LogStore | None = None,
+    ) -> None:
+        self._socket_path = socket_path
+        super().__init__(log)
+
+    def next(self, long_pause_period: int = 4) -> None:
+        self._request(f"next {long_pause_period}")
+
+    def reload(self) -> bool:
+        self._refresh()
+        return True
+
+    def stop(self) -> None:
+        self._request("stop")
+
+    def _refresh(self) -> None:
+        self._request("status")
+
+    def _request(self, command: str) -> None:
+        # Network modules are imported lazily to keep the status fast path
+        # light when no daemon is running.
+        from socket import AF_UNIX, SOCK_STREAM, socket
+
+        with socket(AF_UNIX, SOCK_STREAM) as client:
+            # A stuck daemon raises a TimeoutError, which is an OSError
+            client.settimeout(DAEMON_TIMEOUT)
+            client.connect(str(self._socket_path))
+            client.sendall(f"{command}\n".encode())
+            with client.makefile("r") as response:
+                data = json_loads(response.readline() or "null")
+
+        if isinstance(data, dict) and "error" in data:
+            raise DaemonError(data["error"])
+
+        self._load(data)
+
+
+def is_daemon_running(socket_path: Path = DEFAULT_SOCKET_FILE) -> bool:
+    if not socket_path.exists():
+        return False
+
+    try:
+        DaemonPomodoro(socket_path)
+    except (OSError, StateError):
+        return False
+    return True
+
+
+def connect(
+    socket_path: Path = DEFAULT_SOCKET_FILE,
+    log: LogStore | None = None,
+    state: StateStore | None = None,
+    on_transition: Callable[[Pomodoro], None] | None = None,
+    on_save: Callable[[Pomodoro], None] | None = None,
+) -> Pomodoro:
+    """Return the pomodoro served by the daemon, or a local one if none runs.
+
+    Transition and save hooks only apply to the local pomodoro, the daemon runs
+    its own.
+    """
+    if socket_path.exists():
+        try:
+            return DaemonPomodoro(socket_path, log)
+        except (OSError, StateError):
+            pass
+
+    return Pomodoro(log, state, on_transition, on_save)
@@ -0,0 +1,83 @@
+from csv import writer as csv_writer
+from datetime import datetime, timezone
+from itertools import islice
+from json import dumps as json_dumps
+from typing import Callable, Iterable, Iterator, TextIO
+
+from jtravail.log import LogEntry
+from jtravail.paths import APP_NAME
+
+# Number of entries formatted before each write
+_CHUNK_SIZE = 1000
+
+_ICAL_DATE_FORMAT = "%Y%m%dT%H%M%S"
+
+
+def _chunks(entries: Iterable[LogEntry]) -> Iterator[list[LogEntry]]:
+    iterator = iter(entries)
+    while chunk := list(islice(iterator, _CHUNK_SIZE)):
+        yield chunk
+
+
+def export_jsonl(entries: Iterable[LogEntry], output: TextIO) -> None:
+    for chunk in _chunks(entries):
+        output.write(
+            "".join(
+                json_dumps(
+                    {
+                        "start": entry.start.isoformat(),
+                        "end": entry.end.isoformat(),
+                        "type": entry.type,
+                        "duration": int(entry.duration.total_seconds()),
+                    }
+                )
+                + "\n"
+                for entry in chunk
+            )
+        )
+
+
+def export_csv(entries: Iterable[LogEntry], output: TextIO) -> None:
+    writer = csv_writer(output, lineterminator="\n")
+    writer.writerow(["start", "end", "type", "duration"])
+    for chunk in _chunks(entries):
+        writer.writerows(
+            [
+                entry.start.isoformat(),
+                entry.end.isoformat(),
+                entry.type,
+                int(entry.duration.total_seconds()),
+            ]
+            for entry in chunk
+        )
+
+
+def _format_event(entry: LogEntry, stamp: str) -> str:
+    start = entry.start.strftime(_ICAL_DATE_FORMAT)
+    return (
+        "BEGIN:VEVENT\r\n"
+        + f"UID:{start}-{entry.type}@{APP_NAME}\r\n"
+        + f"DTSTAMP:{stamp}\r\n"
+        + f"DTSTART:{start}\r\n"
+        + f"DTEND:{entry.end.strftime(_ICAL_DATE_FORMAT)}\r\n"
+        + f"SUMMARY:{entry.type}\r\n"
+        + "END:VEVENT\r\n"
+    )
+
+
+def export_ical(entries: Iterable[LogEntry], output: TextIO) -> None:
+    """Write sessions as iCalendar events, in floating local time."""
+    stamp = datetime.now(timezone.utc).strftime(_ICAL_DATE_FORMAT) + "Z"
+    output.write(
+        "BEGIN:VCALENDAR\r\n" + "VERSION:2.0\r\n" + f"PRODID:-//{APP_NAME}//EN\r\n"
+    )
+    for chunk in _chunks(entries):
+        output.write("".join(_format_event(entry, stamp) for entry in chunk))
+    output.write("END:VCALENDAR\r\n")
+
+
+EXPORT_FORMATS: dict[str, Callable[[Iterable[LogEntry], TextIO], None]] = {
+    "jsonl": export_jsonl,
+    "csv": export_csv,
+    "ical": export_ical,
+}
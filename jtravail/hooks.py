@@ -0,0 +1,84 @@
+import sys
+from gettext import gettext as _
+from os import environ, killpg
+from signal import SIGKILL
+
+from jtravail.paths import get_cache_dir
+from jtravail.pomodoro import Pomodoro
+
+DEFAULT_HOOK_LOG_FILE = get_cache_dir() / "hooks.log"
+DEFAULT_HOOK_TIMEOUT = 30
+
+# Configuration options holding the command to run when entering each status
+HOOK_OPTIONS = {
+    "work": "on_work",
+    "pause": "on_pause",
+    "long-pause": "on_long_pause",
+    "idle": "on_stop",
+}
+
+
+class TransitionHooks:
+    """Run user commands when a pomodoro changes status.
+
+    Commands are started in a detached worker process, which kills them after
+    a timeout, so that a slow command never delays the transition.
+    """
+
+    def __init__(
+        self,
+        commands: dict[str, str],
+        timeout: float = DEFAULT_HOOK_TIMEOUT,
+        timer: str = "",
+    ) -> None:
+        self._commands = commands
+        self._timeout = timeout
+        self._timer = timer
+
+    def for_timer(self, timer: str) -> "TransitionHooks":
+        return TransitionHooks(self._commands, self._timeout, timer)
+
+    def __call__(self, pomodoro: Pomodoro) -> None:
+        command = self._commands.get(pomodoro.status)
+        if not command:
+            return
+
+        # Imported here, as most users don't configure hooks
+        from subprocess import DEVNULL, STDOUT, Popen
+
+        DEFAULT_HOOK_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with DEFAULT_HOOK_LOG_FILE.open("ab") as hook_log:
+            Popen(
+                [sys.executable, "-m", "jtravail.hooks", str(self._timeout), command],
+                stdin=DEVNULL,
+                stdout=hook_log,
+                stderr=STDOUT,
+                start_new_session=True,
+                env={
+                    **environ,
+                    "JTRAVAIL_TIMER": self._timer,
+                    "JTRAVAIL_STATUS": pomodoro.status,
+                    "JTRAVAIL_ITERATION": str(pomodoro.iteration),
+                },
+            )
+
+
+def _run_hook(command: str, timeout: float) -> int:
+    from subprocess import Popen, TimeoutExpired
+
+    process = Popen(command, shell=True, start_new_session=True)
+    try:
+        return process.wait(timeout)
+    except TimeoutExpired:
+        # Also kill the processes started by the command
+        killpg(process.pid, SIGKILL)
+        process.wait()
+        print(
+            _('Hook "%s" killed after %s seconds') % (command, timeout),
+            file=sys.stderr,
+        )
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(_run_hook(sys.argv[2], float(sys.argv[1])))
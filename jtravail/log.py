@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+from functools import cached_property
+from gettext import gettext as _
+from io import SEEK_END
+from typing import BinaryIO, Iterable, Iterator, TextIO
+
+_BLOCK_SIZE = 4096
+_EPOCH = datetime(1970, 1, 1)
+
+LOG_HEADER_V2 = b"#jean-travail-log v2\n"
+
+
+class LogError(Exception):
+    pass
+
+
+def format_entry(start: datetime, end: datetime, type_: str) -> str:
+    return f"{start.isoformat()};{end.isoformat()};{type_}"
+
+
+def format_entry_v2(start: datetime, end: datetime, type_: str) -> str:
+    offset = start.astimezone().utcoffset()
+    assert offset is not None
+    return (
+        f"{int(start.timestamp())};{int(end.timestamp())};{type_};"
+        + f"{int(offset.total_seconds())}"
+    )
+
+
+class LogEntry:
+    def __init__(self, line: str) -> None:
+        self._line = line.strip()
+
+    @property
+    def line(self) -> str:
+        return self._line
+
+    @cached_property
+    def start(self) -> datetime:
+        return datetime.fromisoformat(self._columns[0])
+
+    @cached_property
+    def end(self) -> datetime:
+        return datetime.fromisoformat(self._columns[1])
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end - self.start
+
+    @cached_property
+    def type(self) -> str:
+        return self._columns[2]
+
+    @cached_property
+    def _columns(self) -> list[str]:
+        return self._line.split(sep=";", maxsplit=3)
+
+
+class LogEntryV2(LogEntry):
+    """Entry of a v2 log: epoch start and end, type and UTC offset in seconds."""
+
+    @cached_property
+    def start(self) -> datetime:
+        return _EPOCH + timedelta(seconds=int(self._columns[0]) + self._offset)
+
+    @cached_property
+    def end(self) -> datetime:
+        return _EPOCH + timedelta(seconds=int(self._columns[1]) + self._offset)
+
+    @property
+    def duration(self) -> timedelta:
+        return timedelta(seconds=int(self._columns[1]) - int(self._columns[0]))
+
+    @cached_property
+    def _offset(self) -> int:
+        return int(self._columns[3])
+
+
+def read_header(log: BinaryIO) -> tuple[type[LogEntry], int]:
+    """Detect the format of a log file.
+
+    Return the entry class to parse its lines with, and the offset of the first
+    entry.
+    """
+    log.seek(0)
+    header = log.readline()
+    if header == LOG_HEADER_V2:
+        return LogEntryV2, len(header)
+    if header.startswith(b"#"):
+        raise LogError(_("Unsupported log format %s") % header.decode().strip())
+    return LogEntry, 0
+
+
+def seek_line(log: BinaryIO, offset: int) -> None:
+    """Move to the start of the first line beginning at or after offset."""
+    if offset == 0:
+        log.seek(0)
+        return
+
+    log.seek(offset - 1)
+    log.readline()
+
+
+def _seek_since(
+    log: BinaryIO, since: datetime, entry_type: type[LogEntry], start: int
+) -> None:
+    """Move to the first entry ending at or after since.
+
+    Entries are appended when they end, so the log is sorted on end time and
+    the first matching line can be found with a binary search on byte offsets.
+    """
+    low = start
+    high = log.seek(0, SEEK_END)
+    while low < high:
+        middle = (low + high) // 2
+        seek_line(log, middle)
+        line = log.readline()
+        if not line.strip() or entry_type(line.decode()).end >= since:
+            high = middle
+        else:
+            low = middle + 1
+
+    seek_line(log, low)
+
+
+def read_log(
+    log: BinaryIO, since: datetime | None = None, until: datetime | None = None
+) -> Iterator[LogEntry]:
+    """Lazily iterate entries of a log file overlapping [since, until)."""
+    entry_type, start = read_header(log)
+    if since is None:
+        log.seek(start)
+    else:
+        _seek_since(log, since, entry_type, start)
+
+    for line in log:
+        if not line.strip():
+            continue
+
+        entry = entry_type(line.decode())
+        if until is not None and entry.start >= until:
+            return
+        yield entry
+
+
+def read_log_reversed(
+    log: BinaryIO, block_size: int = _BLOCK_SIZE
+) -> Iterator[LogEntry]:
+    """Lazily iterate entries of a log file, from the last to the first."""
+    entry_type, start = read_header(log)
+    position = log.seek(0, SEEK_END)
+    remainder = b""
+    while position > start:
+        size = min(block_size, position - start)
+        position -= size
+        log.seek(position)
+        lines = (log.read(size) + remainder).split(b"\n")
+        remainder = lines.pop(0)
+        for line in reversed(lines):
+            if line.strip():
+                yield entry_type(line.decode())
+
+    if remainder.strip():
+        yield entry_type(remainder.decode())
+
+
+def write_log_v2(entries: Iterable[LogEntry], log: TextIO) -> int:
+    """Write entries to a new v2 log, returning the number of entries."""
+    log.write(LOG_HEADER_V2.decode())
+    count = 0
+    for entry in entries:
+        log.write(format_entry_v2(entry.start, entry.end, entry.type) + "\n")
+        count += 1
+    return count
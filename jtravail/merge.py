@@ -0,0 +1,37 @@
+from datetime import datetime
+from heapq import merge
+from typing import Iterable, Iterator
+
+from jtravail.log import LogEntry, format_entry
+
+_Session = tuple[datetime, datetime, str]
+
+
+def _sessions(entries: Iterable[LogEntry]) -> Iterator[_Session]:
+    # Truncated to seconds, so that a session copied between a v1 and a v2 log
+    # is still seen as a duplicate.
+    for entry in entries:
+        yield (
+            entry.start.replace(microsecond=0),
+            entry.end.replace(microsecond=0),
+            entry.type,
+        )
+
+
+def merge_logs(logs: Iterable[Iterable[LogEntry]]) -> Iterator[LogEntry]:
+    """Merge chronologically sorted logs into a single one.
+
+    Each log is read once, keeping only the last merged session in memory.
+    Sessions are ordered by start, end and type. A session overlapping the
+    previous one is dropped if it ends before it, for example when it's a
+    duplicate, and starts at its end otherwise.
+    """
+    last_end: datetime | None = None
+    for start, end, type_ in merge(*(_sessions(log) for log in logs)):
+        if last_end is not None:
+            if end <= last_end:
+                continue
+            start = max(start, last_end)
+
+        last_end = end
+        yield LogEntry(format_entry(start, end, type_))
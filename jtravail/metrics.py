@@ -0,0 +1,171 @@
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from jtravail.log import LogEntry
+from jtravail.pomodoro import Pomodoro
+
+# Upper bounds of the histogram buckets, the +Inf one being implicit
+_DURATION_BUCKETS = (60, 300, 600, 900, 1200, 1500, 1800, 2700, 3600, 5400)
+_RATIO_BUCKETS = (0.25, 0.5, 0.75, 0.9, 1.0, 1.1, 1.25, 1.5, 2.0)
+
+# Statuses logged when they end, as in the session log
+_SESSION_TYPES = ("work", "pause")
+_STATUSES = ("idle", "work", "pause", "long-pause")
+
+# Sessions can be logged some time after they end, by batches
+_LOOKBACK = timedelta(days=1)
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._buckets, value)] += 1
+        self._sum += value
+
+    def render(self, name: str, labels: str) -> Iterator[str]:
+        count = 0
+        for bound, bucket_count in zip(self._buckets, self._counts):
+            count += bucket_count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+        count += self._counts[-1]
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {count}'
+        yield f"{name}_sum{{{labels}}} {self._sum}"
+        yield f"{name}_count{{{labels}}} {count}"
+
+
+class Metrics:
+    """Prometheus metrics of a pomodoro.
+
+    Session metrics account for the sessions logged by any process, read from
+    the log of the pomodoro. Each scrape only reads the entries that ended
+    recently, keeping the ones already accounted for, so the log isn't scanned
+    again. Counters start from zero with the process, as Prometheus expects.
+    """
+
+    def __init__(
+        self,
+        pomodoro: Pomodoro,
+        work_duration: int,
+        pause_duration: int,
+        long_pause_duration: int,
+    ) -> None:
+        self._pomodoro = pomodoro
+        self._work_duration = work_duration
+        self._pause_duration = pause_duration
+        self._long_pause_duration = long_pause_duration
+        self._configured_durations = {
+            "work": work_duration * 60,
+            "pause": pause_duration * 60,
+        }
+        self._sessions = {type_: 0 for type_ in _SESSION_TYPES}
+        self._durations = {
+            type_: _Histogram(_DURATION_BUCKETS) for type_ in _SESSION_TYPES
+        }
+        self._ratios = {type_: _Histogram(_RATIO_BUCKETS) for type_ in _SESSION_TYPES}
+        self._start = datetime.now()
+        self._since = self._start
+        self._seen: Counter[tuple[datetime, datetime, str]] = Counter()
+
+    def refresh(self) -> None:
+        """Account for the sessions logged since the last refresh."""
+        # Sessions are told apart by their times and type, counting identical
+        # ones, as named timers can log the same session.
+        with self._pomodoro.get_log(since=self._since) as entries:
+            logged = Counter(
+                _get_key(entry) for entry in entries if entry.end >= self._start
+            )
+
+        for key, count in logged.items():
+            for _ in range(count - self._seen[key]):
+                self._observe(*key)
+        self._seen |= logged
+
+        if self._seen:
+            last_end = max(end for _, end, _ in self._seen)
+            self._since = max(self._start, last_end - _LOOKBACK)
+            self._seen = Counter(
+                {
+                    key: count
+                    for key, count in self._seen.items()
+                    if key[1] >= self._since
+                }
+            )
+
+    def _observe(self, start: datetime, end: datetime, type_: str) -> None:
+        if type_ not in self._sessions:
+            return
+
+        duration = (end - start).total_seconds()
+        self._sessions[type_] += 1
+        self._durations[type_].observe(duration)
+        if self._configured_durations[type_]:
+            self._ratios[type_].observe(duration / self._configured_durations[type_])
+
+    def render(self) -> str:
+        return "".join(f"{line}\n" for line in self._render())
+
+    def _render(self) -> Iterator[str]:
+        self._pomodoro.reload()
+        self.refresh()
+        status = self._pomodoro.status
+        remaining = self._pomodoro.get_remaining_time(
+            work_duration=self._work_duration,
+            pause_duration=self._pause_duration,
+            long_pause_duration=self._long_pause_duration,
+        )
+
+        yield "# HELP jtravail_status Current status of the pomodoro."
+        yield "# TYPE jtravail_status gauge"
+        for name in _STATUSES:
+            yield f'jtravail_status{{status="{name}"}} {int(name == status)}'
+
+        yield "# HELP jtravail_iteration Current iteration of the pomodoro."
+        yield "# TYPE jtravail_iteration gauge"
+        yield f"jtravail_iteration {self._pomodoro.iteration}"
+
+        yield (
+            "# HELP jtravail_remaining_seconds Remaining time of the current phase, "
+            + "negative once it ended."
+        )
+        yield "# TYPE jtravail_remaining_seconds gauge"
+        yield f"jtravail_remaining_seconds {remaining.total_seconds()}"
+
+        yield "# HELP jtravail_sessions_total Sessions completed."
+        yield "# TYPE jtravail_sessions_total counter"
+        for type_, count in self._sessions.items():
+            yield f'jtravail_sessions_total{{type="{type_}"}} {count}'
+
+        yield (
+            "# HELP jtravail_configured_duration_seconds Configured duration of "
+            + "sessions."
+        )
+        yield "# TYPE jtravail_configured_duration_seconds gauge"
+        for type_, duration in self._configured_durations.items():
+            yield f'jtravail_configured_duration_seconds{{type="{type_}"}} {duration}'
+
+        yield "# HELP jtravail_session_duration_seconds Actual duration of sessions."
+        yield "# TYPE jtravail_session_duration_seconds histogram"
+        for type_, histogram in self._durations.items():
+            yield from histogram.render(
+                "jtravail_session_duration_seconds", f'type="{type_}"'
+            )
+
+        yield (
+            "# HELP jtravail_session_duration_ratio Actual duration of sessions "
+            + "divided by their configured duration."
+        )
+        yield "# TYPE jtravail_session_duration_ratio histogram"
+        for type_, histogram in self._ratios.items():
+            yield from histogram.render(
+                "jtravail_session_duration_ratio", f'type="{type_}"'
+            )
+
+
+def _get_key(entry: LogEntry) -> tuple[datetime, datetime, str]:
+    return (entry.start, entry.end, entry.type)
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from fcntl import LOCK_EX, flock
+from functools import cache
+from os import environ, getpid
+from pathlib import Path
+from typing import Iterator
+
+from appdirs import user_cache_dir, user_config_dir, user_data_dir
+
+APP_NAME = "jean-travail"
+APP_AUTHOR = "ottorg"
+
+
+@cache
+def get_cache_dir() -> Path:
+    return Path(user_cache_dir(APP_NAME, APP_AUTHOR))
+
+
+@cache
+def get_config_dir() -> Path:
+    return Path(user_config_dir(APP_NAME, APP_AUTHOR))
+
+
+@cache
+def get_data_dir() -> Path:
+    return Path(user_data_dir(APP_NAME, APP_AUTHOR))
+
+
+@cache
+def get_runtime_dir() -> Path:
+    runtime_dir = environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir)
+    return get_cache_dir()
+
+
+def write_file(path: Path, content: bytes) -> None:
+    """Replace the content of a file at once.
+
+    The content is written to a temporary file renamed over the file, so that
+    concurrent readers see either the old or the new content.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f".{path.name}.{getpid()}.tmp")
+    with temporary_path.open("wb") as temporary_file:
+        temporary_file.write(content)
+    temporary_path.replace(path)
+
+
+@contextmanager
+def lock_file(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on a file, created if needed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as lock:
+        flock(lock, LOCK_EX)
+        yield
@@ -1,50 +1,19 @@
-from contextlib import contextmanager
-from datetime import datetime, timedelta
-from functools import cached_property
+from datetime import date, datetime, timedelta
 from gettext import gettext as _
-from json import JSONDecodeError
-from json import dumps as json_dumps
-from json import loads as json_loads
-from pathlib import Path
-from typing import Any, Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Hashable, Iterable
 
-from appdirs import user_cache_dir, user_data_dir
-from click import echo
+from jtravail.log import LogEntry
+from jtravail.paths import get_cache_dir, get_data_dir
+from jtravail.stats import Stats
+from jtravail.storage import FileState, LogStore, StateError, StateStore, TextLog
+from jtravail.trace import trace
 
-_APP_NAME = "jean-travail"
-_APP_AUTHOR = "ottorg"
-_CACHE_DIR = Path(user_cache_dir(_APP_NAME, _APP_AUTHOR))
-_DATA_DIR = Path(user_data_dir(_APP_NAME, _APP_AUTHOR))
-DEFAULT_STATE_FILE = _CACHE_DIR / "state"
+if TYPE_CHECKING:
+    from jtravail.timeline import Timeline
 
-
-class StateError(Exception):
-    pass
-
-
-class LogEntry:
-    def __init__(self, line: str) -> None:
-        self._line = line.strip()
-
-    @cached_property
-    def start(self) -> datetime:
-        return datetime.fromisoformat(self._columns[0])
-
-    @cached_property
-    def end(self) -> datetime:
-        return datetime.fromisoformat(self._columns[1])
-
-    @property
-    def duration(self) -> timedelta:
-        return self.end - self.start
-
-    @cached_property
-    def type(self) -> str:
-        return self._columns[2]
-
-    @cached_property
-    def _columns(self) -> list[str]:
-        return self._line.split(sep=";", maxsplit=3)
+DEFAULT_STATE_FILE = get_cache_dir() / "state"
+DEFAULT_LOG_FILE = get_data_dir() / "log.db"
+DEFAULT_ROLLUP_FILE = get_data_dir() / "rollup.json"
 
 
 _IDLE = "idle"
@@ -67,13 +36,24 @@ _TRANSITIONS: dict[str, Callable[[int, int], tuple[str, int]]] = {
 
 
 class Pomodoro:
-    def __init__(self) -> None:
-        self._state_path = DEFAULT_STATE_FILE
-        self._log_path = _DATA_DIR / "log.db"
+    def __init__(
+        self,
+        log: LogStore | None = None,
+        state: StateStore | None = None,
+        on_transition: "Callable[[Pomodoro], None] | None" = None,
+        on_save: "Callable[[Pomodoro], None] | None" = None,
+    ) -> None:
+        self._state = state or FileState(DEFAULT_STATE_FILE)
+        self._log = log or TextLog(DEFAULT_LOG_FILE, DEFAULT_ROLLUP_FILE)
+        self._on_transition = on_transition
+        # Called while the state is still locked, so that records of the state
+        # are written in the same order as the state itself.
+        self._on_save = on_save
 
         self._status = _IDLE
         self._start_time: datetime | None = None
         self._iteration = 1
+        self._state_stamp: Hashable = None
         self._refresh()
 
     @property
@@ -92,10 +72,34 @@ class Pomodoro:
     def long_pause(self) -> bool:
         return self._status == _LONG_PAUSE
 
+    @property
+    def status(self) -> str:
+        return self._status
+
     @property
     def iteration(self) -> int:
         return self._iteration
 
+    @property
+    def start_time(self) -> datetime | None:
+        return self._start_time
+
+    def get_duration(
+        self,
+        work_duration: int = 25,
+        pause_duration: int = 5,
+        long_pause_duration: int = 15,
+    ) -> timedelta:
+        if self._status == _IDLE:
+            return timedelta(0)
+        if self._status == _WORK:
+            return timedelta(minutes=work_duration)
+        if self._status == _PAUSE:
+            return timedelta(minutes=pause_duration)
+        if self._status == _LONG_PAUSE:
+            return timedelta(minutes=long_pause_duration)
+        assert False
+
     def get_remaining_time(
         self,
         work_duration: int = 25,
@@ -105,45 +109,71 @@ class Pomodoro:
         if self._start_time is None:
             return timedelta(0)
 
-        if self._status == _WORK:
-            duration = work_duration
-        elif self._status == _PAUSE:
-            duration = pause_duration
-        elif self._status == _LONG_PAUSE:
-            duration = long_pause_duration
-        else:
-            assert False
-
-        return timedelta(minutes=duration) - (datetime.now() - self._start_time)
+        duration = self.get_duration(
+            work_duration=work_duration,
+            pause_duration=pause_duration,
+            long_pause_duration=long_pause_duration,
+        )
+        return duration - (datetime.now() - self._start_time)
 
     def next(self, long_pause_period: int = 4) -> None:
-        if self._status is not _IDLE:
-            self._push_log()
-        (self._status, self._iteration) = _TRANSITIONS[self._status](
-            self._iteration, long_pause_period
-        )
-        self._start_time = datetime.now()
-        self._save()
+        # Transitions are made from the latest state, while other processes
+        # are kept from changing it.
+        with self._state.lock():
+            self.reload()
+            if self._status != _IDLE:
+                self._push_log()
+            (self._status, self._iteration) = _TRANSITIONS[self._status](
+                self._iteration, long_pause_period
+            )
+            self._start_time = datetime.now()
+            self._save()
+            if self._on_save is not None:
+                self._on_save(self)
 
-    @contextmanager
-    def get_log(self) -> Iterator[Iterable[LogEntry]]:
-        try:
-            with self._log_path.open("r") as log:
+        if self._on_transition is not None:
+            self._on_transition(self)
+
+    def reload(self) -> bool:
+        if self._state.get_stamp() == self._state_stamp:
+            return False
 
-                def _iterate_log() -> Iterator[LogEntry]:
-                    for line in log.readlines():
-                        yield LogEntry(line)
+        self._refresh()
+        return True
 
-                yield _iterate_log()
-        except FileNotFoundError:
-            yield []
+    def get_log(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> ContextManager[Iterable[LogEntry]]:
+        return self._log.read(since=since, until=until)
+
+    def get_last_log(self, count: int) -> list[LogEntry]:
+        return self._log.read_last(count)
+
+    def get_stats(self) -> dict[date, Stats]:
+        return self._log.get_stats()
+
+    def get_timeline(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> "Timeline":
+        # Imported here, as the timeline may import NumPy
+        from jtravail.timeline import Timeline
+
+        with self._log.read(since=since, until=until) as entries:
+            return Timeline.from_entries(entries)
 
     def stop(self) -> None:
-        try:
-            self._state_path.unlink()
-        except FileNotFoundError:
-            pass
-        self._refresh()
+        with self._state.lock():
+            self._state.clear()
+            self._refresh()
+            if self._on_save is not None:
+                self._on_save(self)
+
+        if self._on_transition is not None:
+            self._on_transition(self)
+
+    def flush(self) -> None:
+        self._state.flush()
+        self._log.flush()
 
     def _load_status(self, data: dict[str, Any]) -> None:
         self._status = data.get("status", _IDLE)
@@ -167,31 +197,43 @@ class Pomodoro:
         except ValueError:
             raise StateError(_('Invalid iteration format "%s"') % data["iteration"])
 
-    def _refresh(self) -> None:
-        try:
-            with self._state_path.open("r") as state_file:
-                try:
-                    data = json_loads(state_file.read() or "{}")
-                except JSONDecodeError as ex:
-                    raise StateError(_("Parse error : %s") % ex)
+    def _load(self, data: Any) -> None:
+        if not isinstance(data, dict):
+            raise StateError(_("Unexpected content"))
 
-            if not isinstance(data, dict):
-                raise StateError(_("Unexpected content"))
+        self._start_time = None
+        self._iteration = 1
 
-            self._start_time = None
-            self._iteration = 1
+        self._load_status(data)
+        if self._status != _IDLE:
+            self._load_start_time(data)
+            self._load_iteration(data)
 
-            self._load_status(data)
-            if self._status is not _IDLE:
-                self._load_start_time(data)
-                self._load_iteration(data)
-        except FileNotFoundError:
-            self._status = _IDLE
-            self._start_time = None
+    def dump(self) -> dict[str, Any]:
+        return {
+            "status": self._status,
+            "start_time": self._start_time and self._start_time.isoformat(),
+            "iteration": self._iteration,
+        }
+
+    def _refresh(self) -> None:
+        self._state_stamp = self._state.get_stamp()
+        try:
+            with trace("state load"):
+                data = self._state.read()
+            if data is None:
+                self._status = _IDLE
+                self._start_time = None
+            else:
+                self._load(data)
         except StateError as ex:
+            # Imported here, as click is slow to import and is only needed to
+            # report errors on the status fast path.
+            from click import echo
+
             echo(
                 _("Error while loading state file %s: %s. State was reset.")
-                % (self._state_path, ex),
+                % (self._state, ex),
                 err=True,
             )
             self._status = _IDLE
@@ -202,22 +244,11 @@ class Pomodoro:
         if self._status not in [_WORK, _PAUSE]:
             return
 
-        if not self._log_path.exists():
-            self._log_path.parent.mkdir(parents=True, exist_ok=True)
-
         assert self._start_time is not None
-        start = self._start_time.isoformat()
-        end = datetime.now().isoformat()
-
-        with self._log_path.open("a") as log_file:
-            log_file.write(f"{start};{end};{self._status}\n")
+        with trace("log append"):
+            self._log.append(self._start_time, datetime.now(), self._status)
 
     def _save(self) -> None:
-        data = {
-            "status": self._status,
-            "start_time": self._start_time and self._start_time.isoformat(),
-            "iteration": self._iteration,
-        }
-        self._state_path.parent.mkdir(parents=True, exist_ok=True)
-        with self._state_path.open("w") as state_file:
-            state_file.write(json_dumps(data))
+        with trace("state save"):
+            self._state.write(self.dump())
+        self._state_stamp = self._state.get_stamp()
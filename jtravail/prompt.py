@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from jtravail.paths import APP_NAME, get_runtime_dir, write_file
+from jtravail.pomodoro import Pomodoro
+
+DEFAULT_PROMPT_FILE = get_runtime_dir() / f"{APP_NAME}.prompt"
+
+# Bumped whenever fields are changed, new fields are only appended
+PROMPT_FORMAT_VERSION = 1
+
+
+class PromptStatus:
+    """Write the status of a pomodoro to a file read by shell prompts.
+
+    The file holds a single line of space separated fields : the format
+    version, the status, the end of the current phase in seconds since the
+    epoch (0 when idle) and the iteration. Prompts compute the remaining time
+    from the end of the phase, without starting any process.
+    """
+
+    def __init__(
+        self,
+        work_duration: int,
+        pause_duration: int,
+        long_pause_duration: int,
+        path: Path = DEFAULT_PROMPT_FILE,
+    ) -> None:
+        self._path = path
+        self.set_durations(work_duration, pause_duration, long_pause_duration)
+
+    def set_durations(
+        self, work_duration: int, pause_duration: int, long_pause_duration: int
+    ) -> None:
+        self._work_duration = work_duration
+        self._pause_duration = pause_duration
+        self._long_pause_duration = long_pause_duration
+
+    def __call__(self, pomodoro: Pomodoro) -> None:
+        end = 0
+        if pomodoro.start_time is not None:
+            duration = pomodoro.get_duration(
+                work_duration=self._work_duration,
+                pause_duration=self._pause_duration,
+                long_pause_duration=self._long_pause_duration,
+            )
+            end = int((pomodoro.start_time + duration).timestamp())
+
+        write_file(
+            self._path,
+            f"{PROMPT_FORMAT_VERSION} {pomodoro.status} {end} "
+            f"{pomodoro.iteration}\n".encode(),
+        )
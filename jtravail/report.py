@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from io import SEEK_END
+from pathlib import Path
+from typing import Iterable
+
+from jtravail.log import read_header, seek_line
+from jtravail.stats import Stats
+
+# Files smaller than this are scanned serially, as starting worker processes
+# costs more than parsing them.
+_MIN_PARALLEL_SIZE = 4 * 1024 * 1024
+
+
+def split_chunks(path: Path, count: int) -> list[tuple[int, int]]:
+    """Split a log file in byte ranges, each holding the lines starting in it."""
+    with path.open("rb") as log:
+        _, start = read_header(log)
+        size = log.seek(0, SEEK_END)
+
+    bounds = [start + (size - start) * index // count for index in range(count)]
+    return [
+        (chunk_start, chunk_end)
+        for chunk_start, chunk_end in zip(bounds, bounds[1:] + [size])
+        if chunk_start < chunk_end
+    ]
+
+
+def aggregate_chunk(path: Path, start: int, end: int) -> dict[date, Stats]:
+    days: dict[date, Stats] = {}
+    with path.open("rb") as log:
+        entry_type, header_end = read_header(log)
+        seek_line(log, max(start, header_end))
+        while log.tell() < end:
+            line = log.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            entry = entry_type(line.decode())
+            days.setdefault(entry.start.date(), Stats()).add_entry(entry)
+    return days
+
+
+def _merge(results: Iterable[dict[date, Stats]]) -> dict[date, Stats]:
+    days: dict[date, Stats] = {}
+    for result in results:
+        for day, stats in result.items():
+            days.setdefault(day, Stats()).add(stats)
+    return dict(sorted(days.items()))
+
+
+def build_report(
+    paths: list[Path], jobs: int = 1, min_parallel_size: int = _MIN_PARALLEL_SIZE
+) -> dict[date, Stats]:
+    """Aggregate per-day statistics of log files.
+
+    Big files are split in newline-aligned chunks, aggregated in parallel in
+    worker processes and merged.
+    """
+    total_size = sum(path.stat().st_size for path in paths)
+    if jobs <= 1 or total_size < min_parallel_size:
+        return _merge(aggregate_chunk(path, 0, path.stat().st_size) for path in paths)
+
+    tasks = [
+        (path, start, end)
+        for path in paths
+        for start, end in split_chunks(
+            path, max(1, jobs * path.stat().st_size // total_size)
+        )
+    ]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return _merge(executor.map(aggregate_chunk, *zip(*tasks)))
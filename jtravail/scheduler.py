@@ -0,0 +1,99 @@
+from asyncio import TimerHandle, get_running_loop
+from heapq import heappop, heappush
+from time import time
+from typing import Callable
+
+from jtravail.pomodoro import Pomodoro
+
+PhaseHook = Callable[[str, Pomodoro], None]
+
+
+class PhaseScheduler:
+    """Calls hooks when the current phase of watched pomodoros ends.
+
+    Deadlines are kept in a heap, and a single asyncio timer is armed for the
+    earliest one, so watching thousands of pomodoros doesn't need a polling
+    loop for each. Entries of pomodoros that changed phase since they were
+    pushed are discarded when they reach the top of the heap.
+
+    Deadlines of fired phases are kept, so watching them again doesn't notify
+    them twice.
+    """
+
+    def __init__(
+        self,
+        hooks: list[PhaseHook],
+        work_duration: int,
+        pause_duration: int,
+        long_pause_duration: int,
+    ) -> None:
+        self._hooks = hooks
+        self._work_duration = work_duration
+        self._pause_duration = pause_duration
+        self._long_pause_duration = long_pause_duration
+        self._heap: list[tuple[float, int, str]] = []
+        self._pomodoros: dict[str, Pomodoro] = {}
+        self._deadlines: dict[str, float] = {}
+        self._sequence = 0
+        self._timer: TimerHandle | None = None
+
+    def watch(self, name: str, pomodoro: Pomodoro) -> None:
+        """Schedule the end of the current phase of a pomodoro.
+
+        Must be called again each time the pomodoro changes phase. Calling it
+        for an unchanged phase is cheap and doesn't schedule it twice.
+        """
+        self._pomodoros[name] = pomodoro
+        start_time = pomodoro.start_time
+        if start_time is None:
+            self._deadlines.pop(name, None)
+            return
+
+        duration = pomodoro.get_duration(
+            work_duration=self._work_duration,
+            pause_duration=self._pause_duration,
+            long_pause_duration=self._long_pause_duration,
+        )
+        deadline = (start_time + duration).timestamp()
+        if self._deadlines.get(name) == deadline:
+            return
+
+        self._deadlines[name] = deadline
+        if deadline <= time():
+            # Phases that were already over when watched aren't notified
+            return
+
+        self._sequence += 1
+        heappush(self._heap, (deadline, self._sequence, name))
+        if self._heap[0][1] == self._sequence:
+            self._arm()
+
+    def unwatch(self, name: str) -> None:
+        self._pomodoros.pop(name, None)
+        self._deadlines.pop(name, None)
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _arm(self) -> None:
+        self.close()
+        if not self._heap:
+            return
+
+        loop = get_running_loop()
+        delay = self._heap[0][0] - time()
+        self._timer = loop.call_at(loop.time() + delay, self._fire)
+
+    def _fire(self) -> None:
+        self._timer = None
+        now = time()
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _sequence, name = heappop(self._heap)
+            if self._deadlines.get(name) != deadline:
+                continue
+
+            for hook in self._hooks:
+                hook(name, self._pomodoros[name])
+        self._arm()
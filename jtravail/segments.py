@@ -0,0 +1,260 @@
+from collections import deque
+from contextlib import contextmanager
+from datetime import date, datetime
+from gzip import GzipFile
+from io import SEEK_END
+from itertools import chain, dropwhile, groupby, islice
+from json import JSONDecodeError
+from json import dumps as json_dumps
+from json import loads as json_loads
+from pathlib import Path
+from shutil import copyfileobj
+from typing import Any, BinaryIO, Iterable, Iterator, cast
+
+from jtravail.log import (
+    LOG_HEADER_V2,
+    LogEntry,
+    format_entry,
+    format_entry_v2,
+    read_log,
+    read_log_reversed,
+)
+from jtravail.paths import get_data_dir, lock_file, write_file
+from jtravail.stats import Stats, dump_days, get_daily_stats, load_days
+from jtravail.storage import LogStore
+
+DEFAULT_SEGMENTS_DIR = get_data_dir() / "segments"
+
+_MANIFEST = "manifest.json"
+
+
+def _open_compressed(path: Path) -> BinaryIO:
+    return cast(BinaryIO, GzipFile(path, "rb"))
+
+
+class _Segment:
+    def __init__(
+        self,
+        name: str,
+        start: datetime,
+        end: datetime,
+        count: int = 0,
+        days: dict[date, Stats] | None = None,
+    ) -> None:
+        self.name = name
+        self.start = start
+        self.end = end
+        self.count = count
+        self.days = days
+
+    @property
+    def closed(self) -> bool:
+        return self.days is not None
+
+    @classmethod
+    def load(cls, data: dict[str, Any]) -> "_Segment":
+        days = data.get("days")
+        return cls(
+            data["name"],
+            datetime.fromisoformat(data["start"]),
+            datetime.fromisoformat(data["end"]),
+            int(data["count"]),
+            None if days is None else load_days(days),
+        )
+
+    def dump(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "name": self.name,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "count": self.count,
+        }
+        if self.days is not None:
+            data["days"] = dump_days(self.days)
+        return data
+
+    def overlaps(self, since: datetime | None, until: datetime | None) -> bool:
+        return (since is None or self.end >= since) and (
+            until is None or self.start < until
+        )
+
+
+class SegmentedLog(LogStore):
+    """Session log split in monthly segment files.
+
+    Entries are appended to the segment of the month they start in, in the v2
+    format. When a new month starts, the previous segment is closed: it is
+    compressed with gzip and its per-day statistics are stored in the manifest,
+    along with the time range and entry count of every segment. Reads only
+    open the segments overlapping the requested range.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_SEGMENTS_DIR) -> None:
+        self._directory = directory
+
+    def append(self, start: datetime, end: datetime, type_: str) -> None:
+        self.extend([LogEntry(format_entry(start, end, type_))])
+
+    def extend(self, entries: Iterable[LogEntry]) -> None:
+        with lock_file(self._directory.with_name(f"{self._directory.name}.lock")):
+            self._extend(entries)
+
+    def _extend(self, entries: Iterable[LogEntry]) -> None:
+        segments = self._load_manifest()
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+        for name, month_entries in groupby(
+            entries, lambda entry: entry.start.strftime("%Y-%m")
+        ):
+            segment = segments[-1] if segments else None
+            # Entries starting before the open segment's month still go to it,
+            # to keep segments sorted.
+            if segment is not None and not segment.closed and segment.name < name:
+                self._close(segment)
+                self._save_manifest(segments)
+            if segment is None or segment.closed:
+                segment = _Segment(name, datetime.max, datetime.min)
+                segments.append(segment)
+
+            path = self._get_path(segment)
+            with path.open("a") as log:
+                # The segment file can exist without being in the manifest
+                if not log.seek(0, SEEK_END):
+                    log.write(LOG_HEADER_V2.decode())
+                for entry in month_entries:
+                    log.write(format_entry_v2(entry.start, entry.end, entry.type))
+                    log.write("\n")
+                    segment.start = min(segment.start, entry.start)
+                    segment.end = max(segment.end, entry.end)
+                    segment.count += 1
+
+        self._save_manifest(segments)
+
+    def count(self) -> int:
+        return sum(segment.count for segment in self._load_manifest())
+
+    @contextmanager
+    def read(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> Iterator[Iterable[LogEntry]]:
+        segments = [
+            segment
+            for segment in self._load_manifest()
+            if segment.overlaps(since, until)
+        ]
+        yield chain.from_iterable(
+            self._read_segment(segment, since, until) for segment in segments
+        )
+
+    def read_last(self, count: int) -> list[LogEntry]:
+        entries: deque[LogEntry] = deque()
+        for segment in reversed(self._load_manifest()):
+            if len(entries) >= count:
+                break
+
+            if segment.closed:
+                with _open_compressed(self._get_path(segment)) as log:
+                    segment_entries = list(
+                        deque(read_log(log), maxlen=count - len(entries))
+                    )
+            else:
+                with self._get_path(segment).open("rb") as log:
+                    segment_entries = list(
+                        islice(read_log_reversed(log), count - len(entries))
+                    )
+                segment_entries.reverse()
+            entries.extendleft(reversed(segment_entries))
+        return list(entries)
+
+    def get_stats(self) -> dict[date, Stats]:
+        days: dict[date, Stats] = {}
+        for segment in self._load_manifest():
+            if segment.days is None:
+                with self._get_path(segment).open("rb") as log:
+                    segment_days = get_daily_stats(read_log(log))
+            else:
+                segment_days = segment.days
+
+            for day, stats in segment_days.items():
+                days.setdefault(day, Stats()).add(stats)
+        return days
+
+    def _read_segment(
+        self, segment: _Segment, since: datetime | None, until: datetime | None
+    ) -> Iterator[LogEntry]:
+        path = self._get_path(segment)
+        if not segment.closed:
+            with path.open("rb") as log:
+                yield from read_log(log, since=since, until=until)
+            return
+
+        # Compressed segments can't be searched, they are scanned instead.
+        with _open_compressed(path) as log:
+            entries = read_log(log, until=until)
+            if since is not None:
+                entries = dropwhile(lambda entry: entry.end < since, entries)
+            yield from entries
+
+    def _close(self, segment: _Segment) -> None:
+        path = self._get_path(segment)
+        compressed_path = path.with_name(f"{path.name}.gz")
+        temporary_path = path.with_name(f"{path.name}.gz.tmp")
+        with path.open("rb") as log:
+            days = get_daily_stats(read_log(log))
+            log.seek(0)
+            with GzipFile(temporary_path, "wb") as compressed_log:
+                copyfileobj(log, compressed_log)
+
+        temporary_path.replace(compressed_path)
+        path.unlink()
+        segment.days = days
+
+    def _get_path(self, segment: _Segment) -> Path:
+        if segment.closed:
+            return self._directory / f"{segment.name}.log.gz"
+        return self._directory / f"{segment.name}.log"
+
+    def _load_manifest(self) -> list[_Segment]:
+        try:
+            with (self._directory / _MANIFEST).open("r") as manifest:
+                data = json_loads(manifest.read())
+            return [_Segment.load(segment) for segment in data["segments"]]
+        except (OSError, JSONDecodeError, KeyError, TypeError, ValueError):
+            return self._rebuild_manifest()
+
+    def _rebuild_manifest(self) -> list[_Segment]:
+        # Segment files are named after their month, compressed ones being
+        # closed. A segment compressed while the manifest was lost can still
+        # have its uncompressed file, which is then ignored.
+        paths = sorted(self._directory.glob("????-??.log*"))
+        closed_names = {
+            path.name.split(".", 1)[0] for path in paths if path.suffix == ".gz"
+        }
+        segments = []
+        for path in paths:
+            name, extension = path.name.split(".", 1)
+            if extension == "log.gz":
+                with _open_compressed(path) as log:
+                    entries = list(read_log(log))
+                days: dict[date, Stats] | None = get_daily_stats(entries)
+            elif extension == "log" and name not in closed_names:
+                with path.open("rb") as log:
+                    entries = list(read_log(log))
+                days = None
+            else:
+                continue
+
+            segments.append(
+                _Segment(
+                    name,
+                    min((entry.start for entry in entries), default=datetime.max),
+                    max((entry.end for entry in entries), default=datetime.min),
+                    len(entries),
+                    days,
+                )
+            )
+        return segments
+
+    def _save_manifest(self, segments: list[_Segment]) -> None:
+        data = {"segments": [segment.dump() for segment in segments]}
+        write_file(self._directory / _MANIFEST, json_dumps(data).encode())
@@ -0,0 +1,131 @@
+from marshal import dumps as marshal_dumps
+from marshal import loads as marshal_loads
+from pathlib import Path
+from time import time_ns
+from typing import Any
+
+from jtravail.paths import get_cache_dir, write_file
+from jtravail.storage import FileState
+
+DEFAULT_SNAPSHOT_FILE = get_cache_dir() / "snapshot"
+
+# Bumped each time the layout of cached entries changes
+_SNAPSHOT_VERSION = 1
+
+
+def read_config(path: Path) -> dict[str, str]:
+    if not path.exists():
+        return {}
+
+    # Imported here, as configparser is slow to import and most users don't
+    # have a configuration file.
+    from configparser import ConfigParser
+
+    config = ConfigParser()
+    config.read(path)
+    if not config.has_section("options"):
+        return {}
+    return dict(config.items("options"))
+
+
+def _get_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class Snapshot:
+    """Parsed state and configuration, cached in a single marshal file.
+
+    Each cached value is keyed on the modification time and size of the file
+    it was parsed from, so an up-to-date value costs a stat call, and the
+    snapshot file is read at most once. As with git's index, a value parsed
+    from a file modified during the same clock tick isn't trusted, as the file
+    could be modified again without changing its stamp.
+    """
+
+    def __init__(
+        self, state_path: Path, config_path: Path, path: Path = DEFAULT_SNAPSHOT_FILE
+    ) -> None:
+        self._state = FileState(state_path)
+        self._state_path = state_path
+        self._config_path = config_path
+        self._path = path
+        self._entries: dict[str, tuple[tuple[int, int] | None, int, Any]] | None = None
+
+    def get_state(self) -> Any:
+        stamp = _get_stamp(self._state_path)
+        cached = self._get("state", stamp)
+        if cached is not None:
+            return cached[0]
+
+        data = self._state.read()
+        self._set("state", stamp, data)
+        return data
+
+    def set_state(self, data: Any) -> None:
+        self._set("state", _get_stamp(self._state_path), data)
+
+    def get_config(self) -> dict[str, str]:
+        stamp = _get_stamp(self._config_path)
+        cached = self._get("config", stamp)
+        if cached is not None:
+            config: dict[str, str] = cached[0]
+            return config
+
+        config = read_config(self._config_path)
+        self._set("config", stamp, config)
+        return config
+
+    def _get(self, key: str, stamp: tuple[int, int] | None) -> tuple[Any] | None:
+        if self._entries is None:
+            self._entries = self._load()
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        cached_stamp, cached_at, data = entry
+        if cached_stamp != stamp or (stamp is not None and stamp[0] >= cached_at):
+            return None
+        return (data,)
+
+    def _set(self, key: str, stamp: tuple[int, int] | None, data: Any) -> None:
+        if self._entries is None:
+            self._entries = self._load()
+
+        self._entries[key] = (stamp, time_ns(), data)
+        self._save()
+
+    def _load(self) -> dict[str, tuple[tuple[int, int] | None, int, Any]]:
+        try:
+            with self._path.open("rb") as snapshot_file:
+                content = marshal_loads(snapshot_file.read())
+        except (FileNotFoundError, EOFError, ValueError, TypeError):
+            return {}
+
+        if not isinstance(content, tuple) or content[:1] != (_SNAPSHOT_VERSION,):
+            return {}
+        entries: dict[str, tuple[tuple[int, int] | None, int, Any]] = content[1]
+        return entries
+
+    def _save(self) -> None:
+        assert self._entries is not None
+        write_file(self._path, marshal_dumps((_SNAPSHOT_VERSION, self._entries)))
+
+
+class SnapshotState(FileState):
+    """State file whose parsed content is cached in a snapshot."""
+
+    def __init__(self, path: Path, snapshot: Snapshot) -> None:
+        super().__init__(path)
+        self._snapshot = snapshot
+
+    def read(self) -> Any:
+        return self._snapshot.get_state()
+
+    def write(self, data: Any) -> None:
+        super().write(data)
+        self._snapshot.set_state(data)
@@ -0,0 +1,127 @@
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from sqlite3 import Connection, connect
+from typing import Iterable, Iterator
+
+from jtravail.log import LogEntry
+from jtravail.paths import get_data_dir
+from jtravail.stats import Stats
+from jtravail.storage import LogStore
+
+DEFAULT_SQLITE_FILE = get_data_dir() / "log.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log (
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS log_start ON log (start);
+CREATE INDEX IF NOT EXISTS log_end ON log (end);
+CREATE INDEX IF NOT EXISTS log_type ON log (type);
+"""
+
+
+def _to_entry(row: tuple[str, str, str]) -> LogEntry:
+    return LogEntry(";".join(row))
+
+
+class SqliteLog(LogStore):
+    """Session log stored in a SQLite database.
+
+    Timestamps are stored as ISO strings, which sort chronologically, so range
+    queries can use the start and end indexes.
+    """
+
+    def __init__(self, path: Path = DEFAULT_SQLITE_FILE) -> None:
+        self._path = path
+        self._connection: Connection | None = None
+
+    def append(self, start: datetime, end: datetime, type_: str) -> None:
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT INTO log (start, end, type) VALUES (?, ?, ?)",
+                (start.isoformat(), end.isoformat(), type_),
+            )
+
+    def extend(self, entries: Iterable[LogEntry]) -> None:
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT INTO log (start, end, type) VALUES (?, ?, ?)",
+                (
+                    (entry.start.isoformat(), entry.end.isoformat(), entry.type)
+                    for entry in entries
+                ),
+            )
+
+    def count(self) -> int:
+        (count,) = self._connect().execute("SELECT count(*) FROM log").fetchone()
+        return int(count)
+
+    @contextmanager
+    def read(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> Iterator[Iterable[LogEntry]]:
+        query = "SELECT start, end, type FROM log"
+        conditions = []
+        parameters = []
+        if since is not None:
+            conditions.append("end >= ?")
+            parameters.append(since.isoformat())
+        if until is not None:
+            conditions.append("start < ?")
+            parameters.append(until.isoformat())
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        cursor = self._connect().execute(query + " ORDER BY start", parameters)
+        try:
+            yield (_to_entry(row) for row in cursor)
+        finally:
+            cursor.close()
+
+    def read_last(self, count: int) -> list[LogEntry]:
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT start, end, type FROM log ORDER BY start DESC LIMIT ?",
+                (count,),
+            )
+            .fetchall()
+        )
+        return [_to_entry(row) for row in reversed(rows)]
+
+    def get_stats(self) -> dict[date, Stats]:
+        rows = self._connect().execute(
+            """
+            SELECT
+                substr(start, 1, 10),
+                type,
+                sum(julianday(end) - julianday(start)) * 86400,
+                count(*)
+            FROM log
+            GROUP BY substr(start, 1, 10), type
+            """
+        )
+
+        days: dict[date, Stats] = {}
+        for day, type_, seconds, count in rows:
+            stats = days.setdefault(date.fromisoformat(day), Stats())
+            duration = timedelta(seconds=round(seconds, 3))
+            if type_ == "work":
+                stats.add(Stats(work_time=duration, pomodoros=count))
+            elif type_ == "pause":
+                stats.add(Stats(pause_time=duration))
+        return days
+
+    def _connect(self) -> Connection:
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = connect(self._path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
@@ -0,0 +1,167 @@
+from datetime import date, timedelta
+from json import JSONDecodeError
+from json import dumps as json_dumps
+from json import loads as json_loads
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable
+
+from jtravail.log import LogEntry, read_header
+from jtravail.paths import write_file
+
+PERIODS: dict[str, Callable[[date], str]] = {
+    "day": lambda day: day.isoformat(),
+    "week": lambda day: "%d-W%02d" % day.isocalendar()[:2],
+    "month": lambda day: day.strftime("%Y-%m"),
+}
+
+
+class Stats:
+    def __init__(
+        self,
+        work_time: timedelta = timedelta(0),
+        pause_time: timedelta = timedelta(0),
+        pomodoros: int = 0,
+    ) -> None:
+        self.work_time = work_time
+        self.pause_time = pause_time
+        self.pomodoros = pomodoros
+
+    def add(self, other: "Stats") -> None:
+        self.work_time += other.work_time
+        self.pause_time += other.pause_time
+        self.pomodoros += other.pomodoros
+
+    def add_entry(self, entry: LogEntry) -> None:
+        if entry.type == "work":
+            self.work_time += entry.duration
+            self.pomodoros += 1
+        elif entry.type == "pause":
+            self.pause_time += entry.duration
+
+
+def get_daily_stats(entries: Iterable[LogEntry]) -> dict[date, Stats]:
+    days: dict[date, Stats] = {}
+    for entry in entries:
+        days.setdefault(entry.start.date(), Stats()).add_entry(entry)
+    return days
+
+
+def dump_days(days: dict[date, Stats]) -> dict[str, list[float]]:
+    return {
+        day.isoformat(): [
+            stats.work_time.total_seconds(),
+            stats.pause_time.total_seconds(),
+            stats.pomodoros,
+        ]
+        for day, stats in sorted(days.items())
+    }
+
+
+def load_days(data: dict[str, list[float]]) -> dict[date, Stats]:
+    return {
+        date.fromisoformat(day): Stats(
+            timedelta(seconds=work), timedelta(seconds=pause), int(pomodoros)
+        )
+        for day, (work, pause, pomodoros) in data.items()
+    }
+
+
+def group_stats(days: dict[date, Stats], period: str) -> dict[str, Stats]:
+    get_key = PERIODS[period]
+    groups: dict[str, Stats] = {}
+    for day in sorted(days):
+        groups.setdefault(get_key(day), Stats()).add(days[day])
+    return groups
+
+
+class Rollup:
+    """Per-day statistics of a log file, updated incrementally.
+
+    The rollup file records the log offset up to which entries were
+    aggregated, along with the last aggregated line. Refreshing only reads the
+    log past this offset, and rebuilds everything if the log no longer matches
+    the checkpoint.
+    """
+
+    def __init__(self, path: Path, log_path: Path) -> None:
+        self._path = path
+        self._log_path = log_path
+        self._offset = 0
+        self._checkpoint = b""
+        self._days: dict[date, Stats] = {}
+
+    @property
+    def days(self) -> dict[date, Stats]:
+        return self._days
+
+    def refresh(self) -> None:
+        self._load()
+
+        try:
+            log = self._log_path.open("rb")
+        except FileNotFoundError:
+            if self._offset:
+                self._reset()
+                self._save()
+            return
+
+        with log:
+            if not self._check(log):
+                self._reset()
+
+            entry_type, start = read_header(log)
+            offset = max(self._offset, start)
+            log.seek(offset)
+            for line in log:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                entry = entry_type(line.decode())
+                self._days.setdefault(entry.start.date(), Stats()).add_entry(entry)
+                self._checkpoint = line
+
+        if offset != self._offset:
+            self._offset = offset
+            self._save()
+
+    def _check(self, log: BinaryIO) -> bool:
+        if not self._offset:
+            return True
+
+        start = self._offset - len(self._checkpoint)
+        if start < 0:
+            return False
+
+        log.seek(start)
+        return log.read(len(self._checkpoint)) == self._checkpoint
+
+    def _reset(self) -> None:
+        self._offset = 0
+        self._checkpoint = b""
+        self._days = {}
+
+    def _load(self) -> None:
+        self._reset()
+        try:
+            with self._path.open("r") as rollup_file:
+                data = json_loads(rollup_file.read())
+
+            offset = int(data["offset"])
+            checkpoint = data["checkpoint"].encode()
+            days = load_days(data["days"])
+        except (FileNotFoundError, JSONDecodeError, KeyError, TypeError, ValueError):
+            return
+
+        self._offset = offset
+        self._checkpoint = checkpoint
+        self._days = days
+
+    def _save(self) -> None:
+        data = {
+            "offset": self._offset,
+            "checkpoint": self._checkpoint.decode(),
+            "days": dump_days(self._days),
+        }
+        write_file(self._path, json_dumps(data).encode())
@@ -0,0 +1,248 @@
+import sys
+from datetime import datetime, timedelta
+from gettext import gettext as _
+from os import environ
+from string import Formatter
+from typing import Any, TypeVar
+
+from jtravail.daemon import connect
+from jtravail.log import LogEntry
+from jtravail.paths import get_config_dir
+from jtravail.pomodoro import DEFAULT_STATE_FILE, Pomodoro
+from jtravail.snapshot import Snapshot, SnapshotState
+from jtravail.stats import Stats
+from jtravail.trace import start_trace, stop_trace, trace
+
+DEFAULT_CONFIG_FILE = get_config_dir() / "config.cfg"
+DEFAULT_WORK_DURATION = 25
+DEFAULT_PAUSE_DURATION = 5
+DEFAULT_LONG_PAUSE_DURATION = 15
+DEFAULT_LONG_PAUSE_PERIOD = 4
+DEFAULT_FORMAT = "{iteration}/{long_pause_period} {status}: {remaining_sign}{minutes:02d}:{seconds:02d}"
+DEFAULT_HISTORY_FORMAT = (
+    "{start:%Y-%m-%d %H:%M} - {end:%H:%M} {status}: {minutes:02d}:{seconds:02d}"
+)
+DEFAULT_STATS_FORMAT = (
+    "{period}: {pomodoros} pomodoros, {work_minutes} min work, "
+    + "{pause_minutes} min pause"
+)
+
+_T = TypeVar("_T", int, str)
+
+
+class FormatError(Exception):
+    pass
+
+
+_STATUS_SAMPLE: dict[str, Any] = {
+    "status": "",
+    "minutes": 0,
+    "seconds": 0,
+    "total_seconds": 0,
+    "remaining_sign": "",
+    "iteration": 0,
+    "long_pause_period": 0,
+    "end": datetime(1970, 1, 1),
+    "progress": 0,
+}
+_REMAINING_FIELDS = frozenset(
+    ["minutes", "seconds", "total_seconds", "remaining_sign", "progress"]
+)
+
+
+def get_status_name(pomodoro: Pomodoro) -> str:
+    if pomodoro.idle:
+        return _("Idle")
+    if pomodoro.work:
+        return _("Work")
+    if pomodoro.pause:
+        return _("Pause")
+    if pomodoro.long_pause:
+        return _("Long Pause")
+    assert False
+
+
+def _get_remaining_fields(remaining_time: timedelta) -> dict[str, Any]:
+    total_seconds = int(remaining_time.total_seconds())
+    minutes = int(total_seconds / 60)
+    return {
+        "minutes": abs(minutes),
+        "seconds": abs(total_seconds - 60 * minutes),
+        "total_seconds": total_seconds,
+        "remaining_sign": "-" if total_seconds < 0 else "",
+    }
+
+
+class StatusFormat:
+    """Status format string, compiled once and rendered on each tick.
+
+    Only the fields used in the format are computed when rendering.
+    """
+
+    def __init__(self, format_: str) -> None:
+        fields = set()
+        try:
+            for _literal, field, _spec, _conversion in Formatter().parse(format_):
+                if field is None:
+                    continue
+                name = field.partition(".")[0].partition("[")[0]
+                if name not in _STATUS_SAMPLE:
+                    raise FormatError(_('Unknown field "%s"') % field)
+                fields.add(name)
+
+            format_.format_map(_STATUS_SAMPLE)
+        except (ValueError, TypeError, KeyError, IndexError, AttributeError) as ex:
+            raise FormatError(_('Invalid format "%s" : %s') % (format_, ex))
+
+        self._format = format_
+        self._fields = frozenset(fields)
+
+    def render(
+        self,
+        pomodoro: Pomodoro,
+        work_duration: int,
+        pause_duration: int,
+        long_pause_period: int,
+        long_pause_duration: int,
+    ) -> str:
+        fields = self._fields
+        values: dict[str, Any] = {}
+
+        if "status" in fields:
+            values["status"] = get_status_name(pomodoro)
+        if "iteration" in fields:
+            values["iteration"] = pomodoro.iteration
+        if "long_pause_period" in fields:
+            values["long_pause_period"] = long_pause_period
+
+        if "end" in fields or "progress" in fields:
+            duration = pomodoro.get_duration(
+                work_duration=work_duration,
+                pause_duration=pause_duration,
+                long_pause_duration=long_pause_duration,
+            )
+
+        if "end" in fields:
+            start_time = pomodoro.start_time or datetime.now()
+            values["end"] = start_time + duration
+
+        if not fields.isdisjoint(_REMAINING_FIELDS):
+            remaining_time = pomodoro.get_remaining_time(
+                work_duration=work_duration,
+                pause_duration=pause_duration,
+                long_pause_duration=long_pause_duration,
+            )
+
+            values.update(_get_remaining_fields(remaining_time))
+
+            if "progress" in fields:
+                if duration:
+                    values["progress"] = (duration - remaining_time) * 100 // duration
+                else:
+                    values["progress"] = 0
+
+        return self._format.format_map(values)
+
+
+def render_log_entry(entry: LogEntry, format_: str) -> str:
+    if entry.type == "work":
+        status_name = _("Work")
+    elif entry.type == "pause":
+        status_name = _("Pause")
+    else:
+        status_name = entry.type
+
+    total_seconds = int(entry.duration.total_seconds())
+    return format_.format(
+        start=entry.start,
+        end=entry.end,
+        status=status_name,
+        minutes=total_seconds // 60,
+        seconds=total_seconds % 60,
+        total_seconds=total_seconds,
+    )
+
+
+def render_stats(period: str, stats: Stats, format_: str) -> str:
+    return format_.format(
+        period=period,
+        pomodoros=stats.pomodoros,
+        work_minutes=int(stats.work_time.total_seconds() // 60),
+        pause_minutes=int(stats.pause_time.total_seconds() // 60),
+    )
+
+
+def get_option(config: dict[str, str], name: str, default: _T) -> _T:
+    value = environ.get(f"JTRAVAIL_{name.upper()}") or config.get(name)
+    if value is None:
+        return default
+    return type(default)(value)
+
+
+def _run_cli() -> None:
+    with trace("cli imports"):
+        from jtravail.cli import main as cli_main
+
+    cli_main()
+
+
+def _print_status() -> None:
+    with trace("config"):
+        snapshot = Snapshot(DEFAULT_STATE_FILE, DEFAULT_CONFIG_FILE)
+        config = snapshot.get_config()
+        try:
+            work_duration = get_option(config, "work_duration", DEFAULT_WORK_DURATION)
+            pause_duration = get_option(
+                config, "pause_duration", DEFAULT_PAUSE_DURATION
+            )
+            long_pause_duration = get_option(
+                config, "long_pause_duration", DEFAULT_LONG_PAUSE_DURATION
+            )
+            long_pause_period = get_option(
+                config, "long_pause_period", DEFAULT_LONG_PAUSE_PERIOD
+            )
+            status_format = StatusFormat(
+                environ.get("JTRAVAIL_STATUS_FORMAT")
+                or config.get("format", DEFAULT_FORMAT)
+            )
+        except (ValueError, FormatError):
+            status_format = None
+
+    if status_format is None:
+        # Let click report the invalid value
+        _run_cli()
+        return
+
+    with trace("command"):
+        pomodoro = connect(state=SnapshotState(DEFAULT_STATE_FILE, snapshot))
+
+    with trace("render"):
+        print(
+            status_format.render(
+                pomodoro,
+                work_duration=work_duration,
+                pause_duration=pause_duration,
+                long_pause_period=long_pause_period,
+                long_pause_duration=long_pause_duration,
+            )
+        )
+
+
+def main() -> None:
+    """Console entry point.
+
+    A plain `status` invocation is answered without importing click, as status
+    bars run it every second. Anything else is handed to the click interface.
+    """
+    if environ.get("JTRAVAIL_TRACE", "") not in ["", "0"]:
+        trace_target: str | None = "-"
+    else:
+        trace_target = environ.get("JTRAVAIL_TRACE_FILE")
+    start_trace(trace_target, environ.get("JTRAVAIL_PROFILE"))
+    try:
+        if sys.argv[1:] == ["status"] and not environ.get("JTRAVAIL_TIMER"):
+            _print_status()
+        else:
+            _run_cli()
+    finally:
+        stop_trace()
@@ -0,0 +1,304 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from copy import deepcopy
+from datetime import date, datetime
+from gettext import gettext as _
+from io import SEEK_END
+from itertools import chain, islice
+from json import JSONDecodeError
+from json import dumps as json_dumps
+from json import loads as json_loads
+from pathlib import Path
+from typing import Any, ContextManager, Hashable, Iterable, Iterator
+
+from jtravail.log import (
+    LOG_HEADER_V2,
+    LogEntry,
+    LogEntryV2,
+    format_entry,
+    format_entry_v2,
+    read_header,
+    read_log,
+    read_log_reversed,
+)
+from jtravail.paths import lock_file, write_file
+from jtravail.stats import Rollup, Stats, get_daily_stats
+
+
+class StateError(Exception):
+    pass
+
+
+class StateStore(ABC):
+    @abstractmethod
+    def read(self) -> Any:
+        """Return the stored state, or None if there is none."""
+
+    @abstractmethod
+    def write(self, data: Any) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def get_stamp(self) -> Hashable:
+        """Return a value that changes whenever the stored state changes."""
+
+    def lock(self) -> ContextManager[None]:
+        """Lock the state against changes from other processes.
+
+        Reading doesn't need the lock, writes are seen at once.
+        """
+        return nullcontext()
+
+    def flush(self) -> None:
+        pass
+
+
+class FileState(StateStore):
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def __str__(self) -> str:
+        return str(self._path)
+
+    def read(self) -> Any:
+        try:
+            with self._path.open("r") as state_file:
+                content = state_file.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            return json_loads(content or "{}")
+        except JSONDecodeError as ex:
+            raise StateError(_("Parse error : %s") % ex)
+
+    def write(self, data: Any) -> None:
+        write_file(self._path, json_dumps(data).encode())
+
+    def clear(self) -> None:
+        self._path.unlink(missing_ok=True)
+
+    def lock(self) -> ContextManager[None]:
+        # The state file is replaced on each write, so it can't be locked
+        return lock_file(self._path.with_name(f"{self._path.name}.lock"))
+
+    def get_stamp(self) -> Hashable:
+        try:
+            stat = self._path.stat()
+        except FileNotFoundError:
+            return None
+        # Writes replace the file, so the inode changes even when the time
+        # and size don't.
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class MemoryState(StateStore):
+    def __init__(self) -> None:
+        self._data: Any = None
+        self._version = 0
+
+    def __str__(self) -> str:
+        return _("memory")
+
+    def read(self) -> Any:
+        return deepcopy(self._data)
+
+    def write(self, data: Any) -> None:
+        self._data = deepcopy(data)
+        self._version += 1
+
+    def clear(self) -> None:
+        self._data = None
+        self._version += 1
+
+    def get_stamp(self) -> Hashable:
+        return self._version
+
+
+class BatchedState(MemoryState):
+    """Keep state changes in memory until flush() writes them to a store."""
+
+    def __init__(self, store: StateStore) -> None:
+        super().__init__()
+        self._store = store
+        self._data = store.read()
+        self._flushed_version = self._version
+
+    def __str__(self) -> str:
+        return str(self._store)
+
+    def flush(self) -> None:
+        if self._version == self._flushed_version:
+            return
+
+        if self._data is None:
+            self._store.clear()
+        else:
+            self._store.write(self._data)
+        self._store.flush()
+        self._flushed_version = self._version
+
+
+class LogStore(ABC):
+    @abstractmethod
+    def append(self, start: datetime, end: datetime, type_: str) -> None:
+        pass
+
+    @abstractmethod
+    def read(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> ContextManager[Iterable[LogEntry]]:
+        """Iterate entries overlapping [since, until), in chronological order."""
+
+    @abstractmethod
+    def read_last(self, count: int) -> list[LogEntry]:
+        """Return the last count entries, in chronological order."""
+
+    @abstractmethod
+    def get_stats(self) -> dict[date, Stats]:
+        pass
+
+    def extend(self, entries: Iterable[LogEntry]) -> None:
+        for entry in entries:
+            self.append(entry.start, entry.end, entry.type)
+
+    def flush(self) -> None:
+        pass
+
+
+class TextLog(LogStore):
+    def __init__(self, path: Path, rollup_path: Path) -> None:
+        self._path = path
+        self._rollup = Rollup(rollup_path, path)
+
+    def append(self, start: datetime, end: datetime, type_: str) -> None:
+        self._write([(start, end, type_)])
+
+    def extend(self, entries: Iterable[LogEntry]) -> None:
+        self._write((entry.start, entry.end, entry.type) for entry in entries)
+
+    @contextmanager
+    def read(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> Iterator[Iterable[LogEntry]]:
+        try:
+            log = self._path.open("rb")
+        except FileNotFoundError:
+            yield []
+            return
+
+        with log:
+            yield read_log(log, since=since, until=until)
+
+    def read_last(self, count: int) -> list[LogEntry]:
+        try:
+            with self._path.open("rb") as log:
+                entries = list(islice(read_log_reversed(log), count))
+        except FileNotFoundError:
+            return []
+
+        entries.reverse()
+        return entries
+
+    def get_stats(self) -> dict[date, Stats]:
+        self._rollup.refresh()
+        return self._rollup.days
+
+    def _write(self, entries: Iterable[tuple[datetime, datetime, str]]) -> None:
+        # Entries are written in the format of the existing log, new logs are
+        # created in the v2 format.
+        with lock_log(self._path):
+            try:
+                with self._path.open("rb") as log:
+                    entry_type, _start = read_header(log)
+                    empty = not log.seek(0, SEEK_END)
+            except FileNotFoundError:
+                entry_type, empty = LogEntryV2, True
+
+            format_ = format_entry if entry_type is LogEntry else format_entry_v2
+            with self._path.open("a") as log_file:
+                if empty:
+                    format_ = format_entry_v2
+                    log_file.write(LOG_HEADER_V2.decode())
+                log_file.writelines(f"{format_(*entry)}\n" for entry in entries)
+
+        self._rollup.refresh()
+
+
+def lock_log(path: Path) -> ContextManager[None]:
+    """Lock a text log against appends and rewrites from other processes.
+
+    The lock is taken on a separate file, as rewrites replace the log.
+    """
+    return lock_file(path.with_name(f"{path.name}.lock"))
+
+
+def _filter_entries(
+    entries: Iterable[LogEntry], since: datetime | None, until: datetime | None
+) -> Iterator[LogEntry]:
+    for entry in entries:
+        if since is not None and entry.end < since:
+            continue
+        if until is not None and entry.start >= until:
+            continue
+        yield entry
+
+
+class MemoryLog(LogStore):
+    def __init__(self) -> None:
+        self._entries: list[LogEntry] = []
+
+    @property
+    def entries(self) -> list[LogEntry]:
+        return self._entries
+
+    def append(self, start: datetime, end: datetime, type_: str) -> None:
+        self._entries.append(LogEntry(format_entry(start, end, type_)))
+
+    @contextmanager
+    def read(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> Iterator[Iterable[LogEntry]]:
+        yield _filter_entries(self._entries, since, until)
+
+    def read_last(self, count: int) -> list[LogEntry]:
+        return self._entries[-count:] if count > 0 else []
+
+    def get_stats(self) -> dict[date, Stats]:
+        return get_daily_stats(self._entries)
+
+
+class BatchedLog(MemoryLog):
+    """Keep appended entries in memory until flush() writes them to a store."""
+
+    def __init__(self, store: LogStore) -> None:
+        super().__init__()
+        self._store = store
+
+    @contextmanager
+    def read(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> Iterator[Iterable[LogEntry]]:
+        with self._store.read(since=since, until=until) as entries:
+            yield chain(entries, _filter_entries(self._entries, since, until))
+
+    def read_last(self, count: int) -> list[LogEntry]:
+        entries = self._store.read_last(count) + self._entries
+        return entries[-count:] if count > 0 else []
+
+    def get_stats(self) -> dict[date, Stats]:
+        days: dict[date, Stats] = {}
+        for source in [self._store.get_stats(), super().get_stats()]:
+            for day, stats in source.items():
+                days.setdefault(day, Stats()).add(stats)
+        return days
+
+    def flush(self) -> None:
+        if self._entries:
+            self._store.extend(self._entries)
+            self._entries = []
+        self._store.flush()
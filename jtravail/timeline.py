@@ -0,0 +1,217 @@
+from array import array
+from datetime import date, datetime, time, timedelta
+from operator import sub
+from typing import Any, Iterable, Iterator
+
+from jtravail.log import LogEntry
+from jtravail.stats import Stats
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+
+class TimelineEntry:
+    """Row view on a Timeline, exposing the same fields as LogEntry."""
+
+    __slots__ = ("_timeline", "_index")
+
+    def __init__(self, timeline: "Timeline", index: int) -> None:
+        self._timeline = timeline
+        self._index = index
+
+    @property
+    def start(self) -> datetime:
+        return datetime.fromtimestamp(self._timeline.starts[self._index])
+
+    @property
+    def end(self) -> datetime:
+        return datetime.fromtimestamp(self._timeline.ends[self._index])
+
+    @property
+    def duration(self) -> timedelta:
+        index = self._index
+        return timedelta(
+            seconds=self._timeline.ends[index] - self._timeline.starts[index]
+        )
+
+    @property
+    def type(self) -> str:
+        return self._timeline.type_names[self._timeline.types[self._index]]
+
+
+class Timeline:
+    """Log entries packed in columns.
+
+    Start and end times are stored as epoch seconds in double arrays, and
+    entry types as 16 bits integer codes, indexing type_names. Operations run
+    over whole columns, using NumPy when it is installed.
+    """
+
+    def __init__(self, type_names: list[str] | None = None) -> None:
+        self.starts = array("d")
+        self.ends = array("d")
+        self.types = array("H")
+        self.type_names: list[str] = list(type_names or [])
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[LogEntry]) -> "Timeline":
+        timeline = cls()
+        for entry in entries:
+            timeline.append(entry.start, entry.end, entry.type)
+        return timeline
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> TimelineEntry:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return TimelineEntry(self, index)
+
+    def __iter__(self) -> Iterator[TimelineEntry]:
+        return (TimelineEntry(self, index) for index in range(len(self)))
+
+    def append(self, start: datetime, end: datetime, type_: str) -> None:
+        self.starts.append(start.timestamp())
+        self.ends.append(end.timestamp())
+        self.types.append(self._get_type_code(type_))
+
+    def durations(self) -> "array[float]":
+        """Return the duration of each entry, in seconds."""
+        if numpy is None:
+            return array("d", map(sub, self.ends, self.starts))
+        return _to_array("d", _view(self.ends) - _view(self.starts))
+
+    def total_duration(self, type_: str | None = None) -> timedelta:
+        timeline = self if type_ is None else self.filter(type_=type_)
+        if numpy is None:
+            return timedelta(seconds=sum(timeline.durations()))
+        return timedelta(seconds=float(_view(timeline.durations()).sum()))
+
+    def filter(
+        self,
+        type_: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> "Timeline":
+        """Return entries of the given type overlapping [since, until)."""
+        code = None
+        if type_ is not None:
+            if type_ not in self.type_names:
+                return Timeline(self.type_names)
+            code = self.type_names.index(type_)
+
+        since_stamp = None if since is None else since.timestamp()
+        until_stamp = None if until is None else until.timestamp()
+
+        timeline = Timeline(self.type_names)
+        if numpy is None:
+            indices = [
+                index
+                for index in range(len(self))
+                if (code is None or self.types[index] == code)
+                and (since_stamp is None or self.ends[index] >= since_stamp)
+                and (until_stamp is None or self.starts[index] < until_stamp)
+            ]
+            timeline.starts = array("d", (self.starts[index] for index in indices))
+            timeline.ends = array("d", (self.ends[index] for index in indices))
+            timeline.types = array("H", (self.types[index] for index in indices))
+            return timeline
+
+        mask = numpy.ones(len(self), dtype=bool)
+        if code is not None:
+            mask &= _view(self.types) == code
+        if since_stamp is not None:
+            mask &= _view(self.ends) >= since_stamp
+        if until_stamp is not None:
+            mask &= _view(self.starts) < until_stamp
+
+        timeline.starts = _to_array("d", _view(self.starts)[mask])
+        timeline.ends = _to_array("d", _view(self.ends)[mask])
+        timeline.types = _to_array("H", _view(self.types)[mask])
+        return timeline
+
+    def get_stats(self) -> dict[date, Stats]:
+        work_code = self._find_type_code("work")
+        pause_code = self._find_type_code("pause")
+        if numpy is not None:
+            return self._get_stats_columns(work_code, pause_code)
+
+        days: dict[date, Stats] = {}
+        for start, duration, code in zip(self.starts, self.durations(), self.types):
+            stats = days.setdefault(date.fromtimestamp(start), Stats())
+            if code == work_code:
+                stats.work_time += timedelta(seconds=duration)
+                stats.pomodoros += 1
+            elif code == pause_code:
+                stats.pause_time += timedelta(seconds=duration)
+        return days
+
+    def _get_stats_columns(
+        self, work_code: int | None, pause_code: int | None
+    ) -> dict[date, Stats]:
+        if not len(self):
+            return {}
+
+        # Entries are bucketed on local midnights rather than a fixed number of
+        # seconds per day, so days keep following DST changes.
+        starts = _view(self.starts)
+        first = date.fromtimestamp(starts.min())
+        last = date.fromtimestamp(starts.max())
+        day_list = [
+            first + timedelta(days=offset) for offset in range((last - first).days + 1)
+        ]
+        midnights = numpy.array(
+            [datetime.combine(day, time()).timestamp() for day in day_list]
+        )
+        buckets = numpy.searchsorted(midnights, starts, side="right") - 1
+
+        size = len(day_list)
+        durations = _view(self.durations())
+        types = _view(self.types)
+        is_work = types == work_code
+        is_pause = types == pause_code
+        entries = numpy.bincount(buckets, minlength=size)
+        pomodoros = numpy.bincount(buckets, weights=is_work, minlength=size)
+        work_times = numpy.bincount(
+            buckets, weights=durations * is_work, minlength=size
+        )
+        pause_times = numpy.bincount(
+            buckets, weights=durations * is_pause, minlength=size
+        )
+
+        return {
+            day_list[index]: Stats(
+                work_time=timedelta(seconds=float(work_times[index])),
+                pause_time=timedelta(seconds=float(pause_times[index])),
+                pomodoros=int(pomodoros[index]),
+            )
+            for index in numpy.flatnonzero(entries)
+        }
+
+    def _find_type_code(self, type_: str) -> int | None:
+        try:
+            return self.type_names.index(type_)
+        except ValueError:
+            return None
+
+    def _get_type_code(self, type_: str) -> int:
+        code = self._find_type_code(type_)
+        if code is None:
+            code = len(self.type_names)
+            self.type_names.append(type_)
+        return code
+
+
+def _view(column: "array[Any]") -> Any:
+    return numpy.frombuffer(column, dtype=column.typecode)
+
+
+def _to_array(typecode: str, values: Any) -> "array[Any]":
+    result = array(typecode)
+    result.frombytes(values.astype(typecode).tobytes())
+    return result
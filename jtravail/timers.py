@@ -0,0 +1,229 @@
+from array import array
+from datetime import datetime, timedelta
+from gettext import gettext as _
+from marshal import dumps as marshal_dumps
+from marshal import loads as marshal_loads
+from pathlib import Path
+from typing import Any, ContextManager, Hashable
+
+from jtravail.hooks import TransitionHooks
+from jtravail.paths import get_cache_dir, lock_file, write_file
+from jtravail.pomodoro import DEFAULT_LOG_FILE, DEFAULT_ROLLUP_FILE, Pomodoro
+from jtravail.storage import LogStore, StateError, StateStore, TextLog
+
+DEFAULT_TIMERS_FILE = get_cache_dir() / "timers"
+
+_TIMERS_VERSION = 1
+_STATUSES = ["idle", "work", "pause", "long-pause"]
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_UNLOADED = object()
+
+
+class TimerStore:
+    """States of many named timers, stored as columns in a single file.
+
+    The whole file is loaded and saved at once. Before each change, the file
+    is loaded again if another process modified it, changes being serialized
+    by lock().
+    """
+
+    def __init__(self, path: Path = DEFAULT_TIMERS_FILE) -> None:
+        self._path = path
+        self._stamp: Hashable = _UNLOADED
+        self._names: list[str] = []
+        self._indices: dict[str, int] = {}
+        self._statuses = array("B")
+        self._start_times = array("q")
+        self._iterations = array("L")
+
+    def __str__(self) -> str:
+        return str(self._path)
+
+    @property
+    def names(self) -> list[str]:
+        """Sorted names of the timers, as of the last refresh."""
+        return sorted(self._names)
+
+    def lock(self) -> ContextManager[None]:
+        return lock_file(self._path.with_name(f"{self._path.name}.lock"))
+
+    def get_stamp(self) -> Hashable:
+        try:
+            stat = self._path.stat()
+        except FileNotFoundError:
+            return None
+        # Writes replace the file, so the inode changes even when the time
+        # and size don't.
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self) -> None:
+        stamp = self.get_stamp()
+        if stamp == self._stamp:
+            return
+
+        # On load errors, the store is left empty until the file changes
+        self._stamp = stamp
+        self._names = []
+        self._indices = {}
+        self._statuses = array("B")
+        self._start_times = array("q")
+        self._iterations = array("L")
+        if stamp is None:
+            return
+
+        try:
+            self._load()
+        except StateError as ex:
+            # Imported here, as click is slow to import and is only needed to
+            # report errors.
+            from click import echo
+
+            echo(_("%s. Timers were reset.") % ex, err=True)
+
+    def get(self, name: str) -> dict[str, Any] | None:
+        index = self._indices.get(name)
+        if index is None:
+            return None
+
+        status = _STATUSES[self._statuses[index]]
+        start_time = None
+        if status != "idle":
+            start_time = _EPOCH + self._start_times[index] * _MICROSECOND
+        return {
+            "status": status,
+            "start_time": start_time and start_time.isoformat(),
+            "iteration": self._iterations[index],
+        }
+
+    def set(self, name: str, data: dict[str, Any]) -> None:
+        self.refresh()
+        try:
+            status = _STATUSES.index(data["status"])
+            start_time = data.get("start_time")
+            start = 0
+            if start_time is not None:
+                start = (datetime.fromisoformat(start_time) - _EPOCH) // _MICROSECOND
+            iteration = int(data["iteration"])
+        except (KeyError, ValueError, TypeError) as ex:
+            raise StateError(_("Invalid timer state: %s") % ex)
+
+        index = self._indices.get(name)
+        if index is None:
+            self._indices[name] = len(self._names)
+            self._names.append(name)
+            self._statuses.append(status)
+            self._start_times.append(start)
+            self._iterations.append(iteration)
+        else:
+            self._statuses[index] = status
+            self._start_times[index] = start
+            self._iterations[index] = iteration
+        self._save()
+
+    def remove(self, name: str) -> None:
+        self.refresh()
+        index = self._indices.pop(name, None)
+        if index is None:
+            return
+
+        # Move the last timer in the freed slot, to keep the columns packed
+        last_name = self._names.pop()
+        for column in [self._statuses, self._start_times, self._iterations]:
+            last_value = column.pop()
+            if index < len(column):
+                column[index] = last_value
+        if index < len(self._names):
+            self._names[index] = last_name
+            self._indices[last_name] = index
+        self._save()
+
+    def _load(self) -> None:
+        try:
+            with self._path.open("rb") as timers_file:
+                version, names, statuses, start_times, iterations = marshal_loads(
+                    timers_file.read()
+                )
+            if version != _TIMERS_VERSION:
+                raise ValueError(_("Unknown version %s") % version)
+            self._statuses.frombytes(statuses)
+            self._start_times.frombytes(start_times)
+            self._iterations.frombytes(iterations)
+        except (EOFError, ValueError, TypeError) as ex:
+            self._statuses = array("B")
+            self._start_times = array("q")
+            self._iterations = array("L")
+            raise StateError(_("Invalid timers file %s: %s") % (self._path, ex))
+        self._names = names
+        self._indices = {name: index for index, name in enumerate(names)}
+
+    def _save(self) -> None:
+        write_file(
+            self._path,
+            marshal_dumps(
+                (
+                    _TIMERS_VERSION,
+                    self._names,
+                    self._statuses.tobytes(),
+                    self._start_times.tobytes(),
+                    self._iterations.tobytes(),
+                )
+            ),
+        )
+        self._stamp = self.get_stamp()
+
+
+class TimerState(StateStore):
+    def __init__(self, store: TimerStore, name: str) -> None:
+        self._store = store
+        self._name = name
+
+    def __str__(self) -> str:
+        return f"{self._store}:{self._name}"
+
+    def read(self) -> Any:
+        self._store.refresh()
+        return self._store.get(self._name)
+
+    def write(self, data: Any) -> None:
+        self._store.set(self._name, data)
+
+    def clear(self) -> None:
+        self._store.remove(self._name)
+
+    def get_stamp(self) -> Hashable:
+        return self._store.get_stamp()
+
+    def lock(self) -> ContextManager[None]:
+        return self._store.lock()
+
+
+class Timers:
+    """Named pomodoros, sharing a timer store and a session log."""
+
+    def __init__(
+        self,
+        store: TimerStore | None = None,
+        log: LogStore | None = None,
+        hooks: TransitionHooks | None = None,
+    ) -> None:
+        self._store = store or TimerStore()
+        self._log = log or TextLog(DEFAULT_LOG_FILE, DEFAULT_ROLLUP_FILE)
+        self._hooks = hooks
+
+    def get(self, name: str) -> Pomodoro:
+        return Pomodoro(
+            self._log,
+            TimerState(self._store, name),
+            self._hooks and self._hooks.for_timer(name),
+        )
+
+    def get_stamp(self) -> Hashable:
+        return self._store.get_stamp()
+
+    def lock(self) -> ContextManager[None]:
+        return self._store.lock()
+
+    def get_all(self) -> list[tuple[str, Pomodoro]]:
+        self._store.refresh()
+        return [(name, self.get(name)) for name in self._store.names]
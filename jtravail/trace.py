@@ -0,0 +1,100 @@
+import sys
+from contextlib import contextmanager, nullcontext
+from json import dump as json_dump
+from time import perf_counter
+from typing import Any, ContextManager, Iterator
+
+from jtravail import IMPORT_START
+
+_NULL_PHASE: ContextManager[None] = nullcontext()
+
+
+class Tracer:
+    """Records the duration of named phases, and an optional cProfile dump.
+
+    Phases are written when the tracer is closed, either as text to stderr when
+    the target is "-", or as a Chrome trace event file otherwise.
+    """
+
+    def __init__(self, target: str | None, profile_path: str | None) -> None:
+        self._target = target
+        self._profile_path = profile_path
+        self._phases: list[tuple[str, int, float, float]] = []
+        self._depth = 0
+        self._profile: Any = None
+
+        self._phases.append(("imports", 0, IMPORT_START, perf_counter()))
+
+        if profile_path is not None:
+            # Imported here, as it's only needed when profiling
+            from cProfile import Profile
+
+            self._profile = Profile()
+            self._profile.enable()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        depth = self._depth
+        index = len(self._phases)
+        start = perf_counter()
+        # Phases are stored in starting order, the end is set when leaving
+        self._phases.append((name, depth, start, start))
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._phases[index] = (name, depth, start, perf_counter())
+            self._depth = depth
+
+    def close(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self._profile_path)
+
+        if self._target == "-":
+            for name, depth, start, end in self._phases:
+                print(
+                    f"trace: {'  ' * depth}{name}: {(end - start) * 1000:.3f} ms",
+                    file=sys.stderr,
+                )
+        elif self._target:
+            events = [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - IMPORT_START) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                }
+                for name, _depth, start, end in self._phases
+            ]
+            with open(self._target, "w") as trace_file:
+                json_dump({"traceEvents": events}, trace_file)
+
+
+_tracer: Tracer | None = None
+
+
+def start_trace(target: str | None, profile_path: str | None = None) -> None:
+    global _tracer
+    if _tracer is None and (target or profile_path):
+        _tracer = Tracer(target, profile_path)
+
+
+def stop_trace() -> None:
+    global _tracer
+    if _tracer is not None:
+        tracer, _tracer = _tracer, None
+        tracer.close()
+
+
+def is_tracing() -> bool:
+    return _tracer is not None
+
+
+def trace(name: str) -> ContextManager[None]:
+    """Time a phase, doing nothing when tracing is disabled."""
+    if _tracer is None:
+        return _NULL_PHASE
+    return _tracer.phase(name)
@@ -1,9 +1,12 @@
 """Nox configuration file"""
 from typing import Callable
 
-from nox import Session
+from nox import Session, options
 from nox import session as nox_session
 
+# Benchmarks are slow, only run them when explicitly asked
+options.tags = ["checks"]
+
 
 def session(
     *tags: str, python: list[str] | None = None
@@ -11,7 +14,7 @@ def session(
     return nox_session(reuse_venv=True, tags=list(tags), python=python)
 
 
-locations = ["jtravail", "tests"]
+locations = ["jtravail", "tests", "benchmarks"]
 
 
 # linting
@@ -47,6 +50,7 @@ def mypy(session: Session) -> None:
         "types-click",
         "types-freezegun",
         "pyfakefs",
+        "numpy",
     )
     session.run("mypy", *locations)
 
@@ -55,6 +59,19 @@ def mypy(session: Session) -> None:
 def unit_tests(session: Session) -> None:
     """Run unit tests."""
     session.install(
-        "-e", ".", "pytest", "pytest-cov", "pytest-datadir", "pyfakefs", "freezegun"
+        "-e",
+        ".[numpy]",
+        "pytest",
+        "pytest-cov",
+        "pytest-datadir",
+        "pyfakefs",
+        "freezegun",
     )
     session.run("python", "-m", "pytest", "--cov=jtravail", "--cov-report=html")
+
+
+@session("benchmarks", python=["3.11"])
+def benchmarks(session: Session) -> None:
+    """Run benchmarks, pass --baseline <results.json> to compare with a previous run."""
+    session.install("-e", ".")
+    session.run("python", "benchmarks/run.py", *session.posargs)
@@ -10,7 +10,8 @@ from freezegun.api import FrozenDateTimeFactory, StepTickTimeFactory
 from pyfakefs.fake_filesystem_unittest import Patcher
 from pytest import fixture
 
-from jtravail.cli import DEFAULT_CONFIG_FILE, main
+from jtravail.cli import main
+from jtravail.status import DEFAULT_CONFIG_FILE
 
 
 class Cli:
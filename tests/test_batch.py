@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from conftest import Cli
+from pytest import MonkeyPatch, raises
+
+from jtravail.pomodoro import DEFAULT_STATE_FILE
+from jtravail.prompt import DEFAULT_PROMPT_FILE
+
+
+def _write_batch(*lines: str) -> None:
+    Path("commands").write_text("".join(f"{line}\n" for line in lines))
+
+
+def test_batch(cli: Cli) -> None:
+    _write_batch("# Two sessions", "", "next", "status", "next  # pause", "status")
+    assert cli("batch commands") == "1/4 Work: 25:00\n1/4 Pause: 05:00\n"
+    assert cli("status") == "1/4 Pause: 05:00\n"
+    assert cli("history -f '{status}'") == "Work\n"
+    assert DEFAULT_PROMPT_FILE.read_text().startswith("1 pause ")
+
+    _write_batch("stop", "status")
+    assert cli("batch -f '{status}' commands") == "Idle\n"
+    assert not DEFAULT_STATE_FILE.exists()
+
+
+def test_batch_checkpoints(cli: Cli) -> None:
+    _write_batch("next", "next", "checkpoint", "next", "next", "start")
+    with raises(SystemExit):
+        cli("batch commands")
+
+    # Changes after the last checkpoint are discarded
+    assert cli("status") == "1/4 Pause: 05:00\n"
+    assert cli("history -f '{status}'") == "Work\n"
+
+
+def test_batch_errors(cli: Cli) -> None:
+    _write_batch("next 'unterminated")
+    with raises(SystemExit):
+        cli("batch commands")
+
+    _write_batch("next")
+    with raises(SystemExit):
+        cli("-t alice batch commands")
+    assert cli("status") == "1/4 Idle: 00:00\n"
+
+
+def test_batch_invalid_state_file(cli: Cli) -> None:
+    DEFAULT_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    DEFAULT_STATE_FILE.write_text("not json")
+
+    _write_batch("next", "status")
+    assert cli("batch commands") == (
+        f"Error while loading state file {DEFAULT_STATE_FILE}: "
+        + "Parse error : Expecting value: line 1 column 1 (char 0). "
+        + "State was reset.\n"
+        + "1/4 Work: 25:00\n"
+    )
+    assert cli("status") == "1/4 Work: 25:00\n"
+
+
+def test_batch_refused_with_daemon(cli: Cli, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr("jtravail.cli.is_daemon_running", lambda: True)
+
+    _write_batch("next")
+    with raises(SystemExit):
+        cli("batch commands")
+    assert not DEFAULT_STATE_FILE.exists()
@@ -0,0 +1,147 @@
+import sys
+from contextlib import contextmanager
+from os import environ
+from pathlib import Path
+from subprocess import DEVNULL, PIPE, Popen
+from tempfile import TemporaryDirectory
+from typing import ContextManager, Iterator
+
+from pyfakefs.fake_filesystem import FakeFilesystem
+
+from jtravail.pomodoro import Pomodoro
+from jtravail.storage import MemoryLog, MemoryState
+
+_PROCESSES = 8
+_TRANSITIONS = 25
+
+# Workers go through the command line entry point, with a hook and the prompt
+# file. Each transition is checked by the status fast path, which reports any
+# partially written state or snapshot file on stderr.
+_WORKER = f"""
+import sys
+from jtravail.status import main
+
+def run(*arguments):
+    sys.argv = ["jean-travail", *arguments]
+    try:
+        main()
+    except SystemExit as ex:
+        if ex.code:
+            raise
+
+for _ in range({_TRANSITIONS}):
+    run("next")
+    run("status")
+"""
+
+
+def test_concurrent_transitions(fs: FakeFilesystem) -> None:
+    fs.pause()
+    try:
+        with TemporaryDirectory() as directory:
+            environment = dict(environ)
+            for name in [
+                "XDG_CACHE_HOME",
+                "XDG_CONFIG_HOME",
+                "XDG_DATA_HOME",
+                "XDG_RUNTIME_DIR",
+            ]:
+                environment[name] = str(Path(directory) / name.lower())
+            config_path = Path(directory) / "xdg_config_home/jean-travail/config.cfg"
+            config_path.parent.mkdir(parents=True)
+            config_path.write_text("[options]\non_long_pause=true\n")
+
+            workers = [
+                Popen(
+                    [sys.executable, "-c", _WORKER],
+                    env=environment,
+                    stdout=DEVNULL,
+                    stderr=PIPE,
+                    text=True,
+                )
+                for _ in range(_PROCESSES)
+            ]
+            errors = [worker.communicate()[1] for worker in workers]
+            assert [worker.returncode for worker in workers] == [0] * _PROCESSES
+            assert errors == [""] * _PROCESSES
+
+            reader = Popen(
+                [
+                    sys.executable,
+                    "-c",
+                    "from jtravail.pomodoro import Pomodoro;"
+                    + "pomodoro = Pomodoro();"
+                    + "print(pomodoro.status, pomodoro.iteration,"
+                    + "len(pomodoro.get_last_log(1000)))",
+                ],
+                env=environment,
+                stdout=PIPE,
+                text=True,
+            )
+            result = reader.communicate()[0]
+            prompt = (
+                Path(directory) / "xdg_runtime_dir/jean-travail.prompt"
+            ).read_text()
+    finally:
+        fs.resume()
+
+    # No transition is lost, whatever the order the processes ran in.
+    log = MemoryLog()
+    reference = Pomodoro(log=log, state=MemoryState())
+    for _ in range(_PROCESSES * _TRANSITIONS):
+        reference.next()
+
+    assert result.split() == [
+        reference.status,
+        str(reference.iteration),
+        str(len(log.entries)),
+    ]
+    assert prompt.split()[1::2] == [reference.status, str(reference.iteration)]
+
+
+def test_transition_uses_latest_state() -> None:
+    state = MemoryState()
+    first = Pomodoro(state=state)
+    second = Pomodoro(state=state)
+
+    first.next()
+    second.next()
+
+    assert second.pause
+    assert Pomodoro(state=state).pause
+
+
+class _LockingState(MemoryState):
+    def __init__(self) -> None:
+        super().__init__()
+        self.locked = False
+
+    def lock(self) -> ContextManager[None]:
+        return self._lock()
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        self.locked = True
+        try:
+            yield
+        finally:
+            self.locked = False
+
+
+def test_save_hook_runs_under_lock() -> None:
+    state = _LockingState()
+    calls: list[tuple[str, bool]] = []
+    pomodoro = Pomodoro(
+        state=state,
+        on_transition=lambda pomodoro: calls.append(("transition", state.locked)),
+        on_save=lambda pomodoro: calls.append((pomodoro.status, state.locked)),
+    )
+
+    pomodoro.next()
+    pomodoro.stop()
+    assert calls == [
+        ("work", True),
+        ("transition", False),
+        ("idle", True),
+        ("transition", False),
+    ]
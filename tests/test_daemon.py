@@ -0,0 +1,117 @@
+from asyncio import create_task, run, sleep
+from pathlib import Path
+from socket import AF_UNIX, SOCK_STREAM, socket
+from tempfile import TemporaryDirectory
+
+from conftest import Cli
+from pyfakefs.fake_filesystem import FakeFilesystem
+from pytest import MonkeyPatch
+
+from jtravail.daemon import DEFAULT_SOCKET_FILE, Daemon, DaemonPomodoro, connect
+from jtravail.pomodoro import DEFAULT_STATE_FILE, Pomodoro
+from jtravail.scheduler import PhaseScheduler
+from jtravail.storage import MemoryLog, MemoryState, StateError
+from jtravail.timers import Timers
+
+
+def test_daemon_commands(cli: Cli) -> None:
+    daemon = Daemon(Pomodoro())
+
+    assert daemon.handle("status\n")["status"] == "idle"
+
+    response = daemon.handle("next\n")
+    assert response["status"] == "work"
+    assert response["iteration"] == 1
+
+    response = daemon.handle("next 1\n")
+    assert response["status"] == "long-pause"
+
+    assert daemon.handle("stop\n")["status"] == "idle"
+    assert not DEFAULT_STATE_FILE.exists()
+
+
+def test_daemon_errors(cli: Cli) -> None:
+    daemon = Daemon(Pomodoro())
+
+    assert daemon.handle("\n") == {"error": "Empty request"}
+    assert daemon.handle("start\n") == {"error": 'Unknown command "start"'}
+    assert daemon.handle("next x\n") == {"error": 'Invalid long pause period "x"'}
+    assert daemon.handle("next 0\n") == {"error": 'Invalid long pause period "0"'}
+    assert daemon.handle("status\n")["status"] == "idle"
+
+
+def test_daemon_state_errors(cli: Cli, monkeypatch: MonkeyPatch) -> None:
+    pomodoro = Pomodoro(log=MemoryLog(), state=MemoryState())
+    daemon = Daemon(pomodoro)
+
+    def _next(long_pause_period: int) -> None:
+        raise StateError("Invalid timer state")
+
+    monkeypatch.setattr(pomodoro, "next", _next)
+    assert daemon.handle("next\n") == {"error": "Invalid timer state"}
+
+
+def test_daemon_reloads_changed_state(cli: Cli) -> None:
+    daemon = Daemon(Pomodoro())
+    assert daemon.handle("status\n")["status"] == "idle"
+
+    cli("next")
+    assert daemon.handle("status\n")["status"] == "work"
+
+
+def test_connect_falls_back_without_daemon(cli: Cli) -> None:
+    pomodoro = connect()
+    assert not isinstance(pomodoro, DaemonPomodoro)
+
+    DEFAULT_SOCKET_FILE.parent.mkdir(parents=True, exist_ok=True)
+    DEFAULT_SOCKET_FILE.touch()
+    pomodoro = connect()
+    assert not isinstance(pomodoro, DaemonPomodoro)
+
+
+def test_daemon_survives_watch_errors(
+    cli: Cli, fs: FakeFilesystem, monkeypatch: MonkeyPatch
+) -> None:
+    def _get_stamp() -> None:
+        raise OSError("Disk on fire")
+
+    timers = Timers(log=MemoryLog())
+    monkeypatch.setattr(timers, "get_stamp", _get_stamp)
+    scheduler = PhaseScheduler(
+        [], work_duration=25, pause_duration=5, long_pause_duration=15
+    )
+    daemon = Daemon(Pomodoro(log=MemoryLog(), state=MemoryState()))
+
+    async def _run(socket_path: Path) -> None:
+        task = create_task(daemon._serve(socket_path, scheduler, timers, None))
+        for _ in range(10):
+            await sleep(0)
+        assert not task.done()
+        task.cancel()
+
+    fs.pause()
+    try:
+        with TemporaryDirectory() as directory:
+            run(_run(Path(directory) / "socket"))
+    finally:
+        fs.resume()
+
+
+def test_connect_falls_back_on_timeout(
+    cli: Cli, fs: FakeFilesystem, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr("jtravail.daemon.DAEMON_TIMEOUT", 0.1)
+
+    fs.pause()
+    try:
+        with TemporaryDirectory() as directory:
+            socket_path = Path(directory) / "socket"
+            # Accepts connections but never answers
+            with socket(AF_UNIX, SOCK_STREAM) as server:
+                server.bind(str(socket_path))
+                server.listen()
+                pomodoro = connect(socket_path, log=MemoryLog(), state=MemoryState())
+    finally:
+        fs.resume()
+
+    assert not isinstance(pomodoro, DaemonPomodoro)
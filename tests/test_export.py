@@ -0,0 +1,94 @@
+from csv import DictReader
+from datetime import datetime, timedelta
+from io import StringIO
+from json import loads as json_loads
+from pathlib import Path
+
+from conftest import Cli
+
+from jtravail.export import export_jsonl
+from jtravail.log import LogEntry, format_entry
+
+
+def _sessions(cli: Cli) -> datetime:
+    start = datetime.now().replace(microsecond=0)
+    cli("next")
+    cli.tick(25 * 60)
+    cli("next")
+    cli.tick(5 * 60)
+    cli("next")
+    cli.tick(25 * 60)
+    cli("next")
+    return start
+
+
+def test_export_jsonl(cli: Cli) -> None:
+    start = _sessions(cli)
+    lines = cli("export").splitlines()
+    assert [json_loads(line) for line in lines] == [
+        {
+            "start": start.isoformat(),
+            "end": (start + timedelta(minutes=25)).isoformat(),
+            "type": "work",
+            "duration": 1500,
+        },
+        {
+            "start": (start + timedelta(minutes=25)).isoformat(),
+            "end": (start + timedelta(minutes=30)).isoformat(),
+            "type": "pause",
+            "duration": 300,
+        },
+        {
+            "start": (start + timedelta(minutes=30)).isoformat(),
+            "end": (start + timedelta(minutes=55)).isoformat(),
+            "type": "work",
+            "duration": 1500,
+        },
+    ]
+
+
+def test_export_csv(cli: Cli) -> None:
+    start = _sessions(cli)
+    since = (start + timedelta(minutes=26)).strftime("%Y-%m-%dT%H:%M:%S")
+    rows = list(DictReader(StringIO(cli(f"export -F csv --since {since}"))))
+    assert [(row["type"], row["duration"]) for row in rows] == [
+        ("pause", "300"),
+        ("work", "1500"),
+    ]
+
+    until = (start + timedelta(minutes=26)).strftime("%Y-%m-%dT%H:%M:%S")
+    rows = list(DictReader(StringIO(cli(f"export -F csv --until {until}"))))
+    assert [row["type"] for row in rows] == ["work", "pause"]
+
+
+def test_export_ical(cli: Cli) -> None:
+    start = _sessions(cli)
+    cli("export -F ical -o /sessions.ics")
+
+    content = Path("/sessions.ics").read_bytes().decode()
+    lines = content.split("\r\n")
+    assert lines[:3] == ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//jean-travail//EN"]
+    assert lines[-2:] == ["END:VCALENDAR", ""]
+    assert lines.count("BEGIN:VEVENT") == 3
+    assert f"DTSTART:{start:%Y%m%dT%H%M%S}" in lines
+    assert f"DTEND:{start + timedelta(minutes=55):%Y%m%dT%H%M%S}" in lines
+
+
+def test_export_chunks() -> None:
+    start = datetime(2023, 1, 1)
+    entries = (
+        LogEntry(format_entry(start, start + timedelta(minutes=index), "work"))
+        for index in range(2500)
+    )
+
+    class _Output(StringIO):
+        writes = 0
+
+        def write(self, text: str) -> int:
+            self.writes += 1
+            return super().write(text)
+
+    output = _Output()
+    export_jsonl(entries, output)
+    assert output.writes == 3
+    assert len(output.getvalue().splitlines()) == 2500
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from conftest import Cli
+from pytest import raises
+
+from jtravail.log import read_log_reversed
+from jtravail.pomodoro import DEFAULT_LOG_FILE
+
+
+def test_history(cli: Cli) -> None:
+    assert cli("history") == ""
+
+    cli("next")
+    cli.tick(25 * 60)
+    cli("next")
+    cli.tick(5 * 60 + 3)
+    cli("next")
+    cli.tick(20 * 60)
+    cli("next")
+
+    assert cli("history -f '{status} {minutes:02d}:{seconds:02d}'") == (
+        "Work 25:00\n" + "Pause 05:03\n" + "Work 20:00\n"
+    )
+    assert cli("history -n 1 -f '{status}'") == "Work\n"
+    assert cli("history --last 2 -f '{total_seconds}'") == "303\n1200\n"
+
+
+def test_history_format_parameter(cli: Cli) -> None:
+    cli("next", "next")
+
+    with cli.config(history_format="From config"):
+        assert cli("history") == "From config\n"
+
+        with cli.environment(JTRAVAIL_HISTORY_FORMAT="From env"):
+            assert cli("history") == "From env\n"
+            assert cli("history -f 'From command line'") == "From command line\n"
+
+
+def test_read_log_reversed(cli: Cli) -> None:
+    DEFAULT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with DEFAULT_LOG_FILE.open("w") as log:
+        for day in range(1, 29):
+            start = datetime(2023, 2, day, 10)
+            end = datetime(2023, 2, day, 11)
+            log.write(f"{start.isoformat()};{end.isoformat()};work\n")
+
+    for block_size in [1, 7, 38, 4096]:
+        with DEFAULT_LOG_FILE.open("rb") as log:
+            days = [entry.start.day for entry in read_log_reversed(log, block_size)]
+        assert days == list(range(28, 0, -1))
+
+
+def test_history_negative_last(cli: Cli) -> None:
+    cli("next", "next")
+    assert cli("history -n 0") == ""
+    with raises(SystemExit):
+        cli("history -n -1")
@@ -0,0 +1,75 @@
+import sys
+from subprocess import PIPE, STDOUT, run
+from typing import Any
+
+from conftest import Cli
+from pyfakefs.fake_filesystem import FakeFilesystem
+from pytest import MonkeyPatch
+
+from jtravail.hooks import DEFAULT_HOOK_LOG_FILE
+
+
+class _Popen:
+    calls: list[tuple[list[str], dict[str, str]]] = []
+
+    def __init__(self, arguments: list[str], env: dict[str, str], **_: Any) -> None:
+        self.calls.append((arguments, env))
+
+
+def test_transition_hooks(cli: Cli, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr("subprocess.Popen", _Popen)
+    _Popen.calls = []
+
+    with cli.config(on_work="echo work", on_stop="echo stop", hook_timeout="5"):
+        cli("next", "next", "next", "stop", "status")
+        cli("-t alice next")
+
+    assert [
+        (
+            arguments[-2:],
+            env["JTRAVAIL_STATUS"],
+            env["JTRAVAIL_ITERATION"],
+            env["JTRAVAIL_TIMER"],
+        )
+        for arguments, env in _Popen.calls
+    ] == [
+        (["5", "echo work"], "work", "1", ""),
+        (["5", "echo work"], "work", "2", ""),
+        (["5", "echo stop"], "idle", "2", ""),
+        (["5", "echo work"], "work", "1", "alice"),
+    ]
+    assert DEFAULT_HOOK_LOG_FILE.exists()
+
+
+def test_no_hooks(cli: Cli, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr("subprocess.Popen", _Popen)
+    _Popen.calls = []
+
+    with cli.environment(JTRAVAIL_ON_PAUSE="echo pause"):
+        cli("next", "stop")
+    assert _Popen.calls == []
+
+
+def test_hook_timeout(fs: FakeFilesystem) -> None:
+    fs.pause()
+    try:
+        result = run(
+            [
+                sys.executable,
+                "-m",
+                "jtravail.hooks",
+                "0.2",
+                "echo started; sleep 10; echo finished",
+            ],
+            stdout=PIPE,
+            stderr=STDOUT,
+            text=True,
+        )
+    finally:
+        fs.resume()
+
+    assert result.returncode == 1
+    assert result.stdout == (
+        'started\nHook "echo started; sleep 10; echo finished" killed after '
+        + "0.2 seconds\n"
+    )
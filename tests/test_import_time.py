@@ -0,0 +1,78 @@
+import sys
+from os import environ
+from pathlib import Path
+from subprocess import run
+from tempfile import TemporaryDirectory
+
+from pyfakefs.fake_filesystem import FakeFilesystem
+
+# Cumulative import time budget of the status fast path, in microseconds.
+_IMPORT_TIME_BUDGET = 100_000
+
+_SLOW_MODULES = [
+    "click",
+    "configparser",
+    "socket",
+    "socketserver",
+    "asyncio",
+    "sqlite3",
+    "numpy",
+    "jtravail.cli",
+]
+
+
+def _import_times(fs: FakeFilesystem) -> dict[str, int]:
+    fs.pause()
+    try:
+        with TemporaryDirectory() as directory:
+            # The status must not depend on the pomodoro or the options of the
+            # user running the tests.
+            environment = {
+                name: value
+                for name, value in environ.items()
+                if not name.startswith(("XDG_", "JTRAVAIL_"))
+            }
+            environment["HOME"] = directory
+            for name in [
+                "XDG_CACHE_HOME",
+                "XDG_CONFIG_HOME",
+                "XDG_DATA_HOME",
+                "XDG_RUNTIME_DIR",
+            ]:
+                environment[name] = str(Path(directory) / name.lower())
+
+            result = run(
+                [
+                    sys.executable,
+                    "-X",
+                    "importtime",
+                    "-c",
+                    "import sys; sys.argv = ['jean-travail', 'status'];"
+                    + "from jtravail.status import main; main()",
+                ],
+                capture_output=True,
+                check=True,
+                text=True,
+                env=environment,
+            )
+    finally:
+        fs.resume()
+
+    assert result.stdout == "1/4 Idle: 00:00\n"
+
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+def test_status_fast_path_imports(fs: FakeFilesystem) -> None:
+    import_times = _import_times(fs)
+
+    for module in _SLOW_MODULES:
+        assert module not in import_times
+
+    assert import_times["jtravail.status"] < _IMPORT_TIME_BUDGET
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from conftest import Cli
+from pytest import mark
+
+from jtravail.pomodoro import DEFAULT_LOG_FILE, Pomodoro
+
+_ORIGIN = datetime(2023, 1, 1)
+
+
+def _write_log(count: int) -> None:
+    DEFAULT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with DEFAULT_LOG_FILE.open("w") as log:
+        for index in range(count):
+            start = _ORIGIN + timedelta(minutes=30 * index)
+            end = start + timedelta(minutes=25 if index % 2 else 5)
+            type_ = "work" if index % 2 else "pause"
+            log.write(f"{start.isoformat()};{end.isoformat()};{type_}\n")
+
+
+def _starts(
+    since: datetime | None = None, until: datetime | None = None
+) -> list[datetime]:
+    with Pomodoro().get_log(since=since, until=until) as log:
+        return [entry.start for entry in log]
+
+
+def test_get_log(cli: Cli) -> None:
+    assert _starts() == []
+
+    cli("next")
+    cli.tick(60)
+    cli("next")
+    cli.tick(30)
+    cli("next")
+
+    with Pomodoro().get_log() as log:
+        entries = list(log)
+
+    assert [entry.type for entry in entries] == ["work", "pause"]
+    assert [entry.duration for entry in entries] == [
+        timedelta(seconds=60),
+        timedelta(seconds=30),
+    ]
+
+
+@mark.parametrize("count", [1, 2, 3, 100, 1001])
+def test_get_log_range(cli: Cli, count: int) -> None:
+    _write_log(count)
+    all_starts = [_ORIGIN + timedelta(minutes=30 * index) for index in range(count)]
+
+    assert _starts() == all_starts
+    assert _starts(since=_ORIGIN - timedelta(days=1)) == all_starts
+    assert _starts(until=_ORIGIN) == []
+    assert _starts(since=all_starts[-1] + timedelta(hours=1)) == []
+
+    for index in [0, count // 3, count // 2, count - 1]:
+        start = all_starts[index]
+        assert _starts(since=start) == all_starts[index:]
+        assert _starts(since=start + timedelta(minutes=4)) == all_starts[index:]
+        assert _starts(until=start) == all_starts[:index]
+        until = start + timedelta(hours=1)
+        assert _starts(since=start, until=until) == all_starts[index:][:2]
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+from conftest import Cli
+from pytest import raises
+
+from jtravail.log import LOG_HEADER_V2, LogError
+from jtravail.pomodoro import DEFAULT_LOG_FILE, Pomodoro
+
+_ORIGIN = datetime(2023, 1, 1, 9)
+
+
+def _write_v1_log(count: int) -> None:
+    DEFAULT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with DEFAULT_LOG_FILE.open("w") as log:
+        for index in range(count):
+            start = _ORIGIN + timedelta(hours=index)
+            end = start + timedelta(minutes=25)
+            log.write(f"{start.isoformat()};{end.isoformat()};work\n")
+
+
+def _read_lines() -> list[str]:
+    with DEFAULT_LOG_FILE.open("r") as log:
+        return log.read().splitlines()
+
+
+def test_new_logs_use_v2_format(cli: Cli) -> None:
+    cli("next")
+    cli.tick(25 * 60)
+    cli("next")
+
+    header, line = _read_lines()
+    assert header + "\n" == LOG_HEADER_V2.decode()
+
+    start, end, type_, offset = line.split(";")
+    assert int(end) - int(start) == 25 * 60
+    assert type_ == "work"
+    int(offset)
+
+    assert cli("history -f '{status} {minutes}'") == "Work 25\n"
+    with Pomodoro().get_log(since=datetime.now() - timedelta(minutes=1)) as entries:
+        assert [entry.type for entry in entries] == ["work"]
+
+
+def test_v1_logs_are_appended_in_v1_format(cli: Cli) -> None:
+    _write_v1_log(2)
+    cli("next")
+    cli.tick(25 * 60)
+    cli("next")
+
+    lines = _read_lines()
+    assert len(lines) == 3
+    assert datetime.fromisoformat(lines[-1].split(";")[0])
+
+
+def test_migrate_log(cli: Cli) -> None:
+    _write_v1_log(500)
+    with Pomodoro().get_log() as entries:
+        expected = [(entry.start, entry.end, entry.type) for entry in entries]
+    stats = Pomodoro().get_stats()
+
+    assert cli("migrate-log") == "Converted 500 sessions to the v2 format\n"
+    assert _read_lines()[0] + "\n" == LOG_HEADER_V2.decode()
+
+    with Pomodoro().get_log() as entries:
+        assert [(entry.start, entry.end, entry.type) for entry in entries] == expected
+
+    since = _ORIGIN + timedelta(hours=250)
+    with Pomodoro().get_log(since=since) as entries:
+        assert [entry.start for entry in entries][:1] == [since]
+
+    assert [entry.start for entry in Pomodoro().get_last_log(2)] == [
+        entry[0] for entry in expected[-2:]
+    ]
+    assert [day.pomodoros for day in Pomodoro().get_stats().values()] == [
+        day.pomodoros for day in stats.values()
+    ]
+
+    assert cli("migrate-log") == f"{DEFAULT_LOG_FILE} is already in the v2 format\n"
+
+
+def test_unsupported_log_format(cli: Cli) -> None:
+    DEFAULT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with DEFAULT_LOG_FILE.open("w") as log:
+        log.write("#jean-travail-log v3\n")
+
+    with raises(LogError):
+        Pomodoro().get_last_log(1)
+
+    with raises(SystemExit):
+        cli("migrate-log")
+
+
+def test_migrate_malformed_log(cli: Cli) -> None:
+    _write_v1_log(2)
+    with DEFAULT_LOG_FILE.open("a") as log:
+        log.write("yesterday;today;work\n")
+    lines = _read_lines()
+
+    with raises(SystemExit):
+        cli("migrate-log")
+    assert _read_lines() == lines
+    assert not DEFAULT_LOG_FILE.with_name(f"{DEFAULT_LOG_FILE.name}.v2").exists()
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from conftest import Cli
+from pytest import raises
+
+from jtravail.log import LogEntry, format_entry, format_entry_v2, read_log
+from jtravail.merge import merge_logs
+
+_START = datetime(2023, 6, 1, 9)
+
+
+def _entry(start: int, end: int, type_: str = "work") -> LogEntry:
+    return LogEntry(
+        format_entry(
+            _START + timedelta(minutes=start), _START + timedelta(minutes=end), type_
+        )
+    )
+
+
+def _minutes(entries: list[LogEntry]) -> list[tuple[int, int, str]]:
+    return [
+        (
+            (entry.start - _START) // timedelta(minutes=1),
+            (entry.end - _START) // timedelta(minutes=1),
+            entry.type,
+        )
+        for entry in entries
+    ]
+
+
+def test_merge_logs() -> None:
+    laptop = [_entry(0, 25), _entry(25, 30, "pause"), _entry(60, 85)]
+    desktop = [_entry(0, 25), _entry(28, 53), _entry(100, 125)]
+    assert _minutes(list(merge_logs([laptop, desktop]))) == [
+        (0, 25, "work"),
+        (25, 30, "pause"),
+        (30, 53, "work"),
+        (60, 85, "work"),
+        (100, 125, "work"),
+    ]
+    assert _minutes(list(merge_logs([desktop, laptop]))) == _minutes(
+        list(merge_logs([laptop, desktop]))
+    )
+
+    # Contained sessions are dropped
+    assert _minutes(list(merge_logs([[_entry(0, 25)], [_entry(5, 10)]]))) == [
+        (0, 25, "work")
+    ]
+
+
+def _write_log(path: Path, entries: list[LogEntry], v2: bool) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as log:
+        if v2:
+            log.write("#jean-travail-log v2\n")
+        for entry in entries:
+            format_ = format_entry_v2 if v2 else format_entry
+            log.write(format_(entry.start, entry.end, entry.type) + "\n")
+
+
+def test_merge_command(cli: Cli) -> None:
+    laptop = [_entry(0, 25), _entry(25, 30, "pause")]
+    _write_log(Path("/sync/laptop.db"), laptop, v2=False)
+    _write_log(Path("/sync/desktop.db"), [_entry(0, 25), _entry(60, 85)], v2=True)
+    _write_log(Path("/phone.db"), [_entry(100, 125)], v2=True)
+    # Other files of a synced data directory
+    Path("/sync/log.db.lock").touch()
+    Path("/sync/rollup.json").write_text('{"offset": 79, "days": {}}')
+    Path("/sync/log.sqlite").write_bytes(b"SQLite format 3\x00\xff\xfe\n")
+
+    assert cli("merge /sync /phone.db -o /sync/laptop.db") == (
+        "Merged 4 sessions from 3 logs\n"
+    )
+    with Path("/sync/laptop.db").open("rb") as merged:
+        assert _minutes(list(read_log(merged))) == [
+            (0, 25, "work"),
+            (25, 30, "pause"),
+            (60, 85, "work"),
+            (100, 125, "work"),
+        ]
+
+
+def test_merge_invalid_log(cli: Cli) -> None:
+    Path("/invalid.db").write_text("#unknown\n")
+    _write_log(Path("/log.db"), [_entry(0, 25)], v2=True)
+
+    with raises(SystemExit):
+        cli("merge /log.db /invalid.db -o /merged.db")
+    assert not Path("/merged.db").exists()
+    assert not Path("/merged.db.tmp").exists()
@@ -0,0 +1,110 @@
+from asyncio import open_connection, run, start_server
+
+from conftest import Cli
+
+from jtravail.daemon import Daemon
+from jtravail.metrics import Metrics
+from jtravail.pomodoro import Pomodoro
+from jtravail.storage import BatchedLog, MemoryLog, MemoryState
+
+
+def _daemon() -> tuple[Daemon, Metrics]:
+    pomodoro = Pomodoro(log=MemoryLog(), state=MemoryState())
+    metrics = Metrics(
+        pomodoro, work_duration=25, pause_duration=5, long_pause_duration=15
+    )
+    return Daemon(pomodoro, metrics), metrics
+
+
+def _samples(metrics: Metrics) -> dict[str, str]:
+    return dict(
+        line.rsplit(" ", 1)
+        for line in metrics.render().splitlines()
+        if not line.startswith("#")
+    )
+
+
+def test_metrics(cli: Cli) -> None:
+    daemon, metrics = _daemon()
+
+    samples = _samples(metrics)
+    assert samples['jtravail_status{status="idle"}'] == "1"
+    assert samples['jtravail_sessions_total{type="work"}'] == "0"
+
+    daemon.handle("next\n")
+    cli.tick(30 * 60)
+    daemon.handle("next\n")
+    cli.tick(60)
+    daemon.handle("next\n")
+    cli.tick(10 * 60)
+
+    samples = _samples(metrics)
+    assert samples['jtravail_status{status="work"}'] == "1"
+    assert samples['jtravail_status{status="pause"}'] == "0"
+    assert samples["jtravail_iteration"] == "2"
+    assert samples["jtravail_remaining_seconds"] == "900.0"
+    assert samples['jtravail_sessions_total{type="work"}'] == "1"
+    assert samples['jtravail_sessions_total{type="pause"}'] == "1"
+
+    work_durations = 'jtravail_session_duration_seconds_bucket{type="work",le="%s"}'
+    assert samples[work_durations % "1500"] == "0"
+    assert samples[work_durations % "1800"] == "1"
+    assert samples[work_durations % "+Inf"] == "1"
+    assert samples['jtravail_session_duration_seconds_sum{type="work"}'] == "1800.0"
+
+    pause_ratios = 'jtravail_session_duration_ratio_bucket{type="pause",le="%s"}'
+    assert samples[pause_ratios % "0.25"] == "1"
+    assert samples['jtravail_session_duration_ratio_sum{type="pause"}'] == "0.2"
+
+
+def test_metrics_endpoint(cli: Cli) -> None:
+    daemon, _ = _daemon()
+
+    async def _get(path: str) -> bytes:
+        server = await start_server(daemon._handle_metrics, "127.0.0.1", 0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await open_connection("127.0.0.1", port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            response = await reader.read()
+            writer.close()
+            return response
+
+    response = run(_get("/metrics"))
+    headers, body = response.split(b"\r\n\r\n", 1)
+    assert headers.startswith(b"HTTP/1.0 200 OK\r\n")
+    assert b'jtravail_status{status="idle"} 1\n' in body
+
+    assert run(_get("/")).startswith(b"HTTP/1.0 404 Not Found\r\n")
+
+
+def test_metrics_follow_log(cli: Cli) -> None:
+    log = MemoryLog()
+    before = Pomodoro(log=log, state=MemoryState())
+    before.next()
+    cli.tick(60)
+    before.next()
+    cli.tick(1)
+
+    pomodoro = Pomodoro(log=log, state=MemoryState())
+    metrics = Metrics(
+        pomodoro, work_duration=25, pause_duration=5, long_pause_duration=15
+    )
+    # Sessions logged by other processes, such as named timers or batches
+    other = Pomodoro(log=log, state=MemoryState())
+    batch = Pomodoro(log=BatchedLog(log), state=MemoryState())
+    for timer in [other, batch]:
+        timer.next()
+    cli.tick(20 * 60)
+    other.next()
+    batch.next()
+    assert _samples(metrics)['jtravail_sessions_total{type="work"}'] == "1"
+
+    cli.tick(60)
+    batch.flush()
+    samples = _samples(metrics)
+    assert samples['jtravail_sessions_total{type="work"}'] == "2"
+    assert samples['jtravail_session_duration_seconds_sum{type="work"}'] == "2400.0"
+
+    # Scrapes don't account for sessions twice
+    assert _samples(metrics) == samples
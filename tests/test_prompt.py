@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from conftest import Cli
+
+from jtravail.prompt import DEFAULT_PROMPT_FILE
+
+
+def _end_in(minutes: int) -> str:
+    return str(int((datetime.now() + timedelta(minutes=minutes)).timestamp()))
+
+
+def test_prompt_status(cli: Cli) -> None:
+    assert not DEFAULT_PROMPT_FILE.exists()
+
+    cli("next")
+    assert DEFAULT_PROMPT_FILE.read_text() == f"1 work {_end_in(25)} 1\n"
+
+    cli.tick(60)
+    cli("status")
+    assert DEFAULT_PROMPT_FILE.read_text() == f"1 work {_end_in(24)} 1\n"
+
+    cli("next")
+    assert DEFAULT_PROMPT_FILE.read_text() == f"1 pause {_end_in(5)} 1\n"
+
+    cli("stop")
+    assert DEFAULT_PROMPT_FILE.read_text() == "1 idle 0 1\n"
+
+
+def test_prompt_status_durations(cli: Cli) -> None:
+    with cli.config(work_duration="50"):
+        cli("next")
+    assert DEFAULT_PROMPT_FILE.read_text() == f"1 work {_end_in(50)} 1\n"
+
+    with cli.environment(JTRAVAIL_PAUSE_DURATION="10"):
+        cli("next")
+    assert DEFAULT_PROMPT_FILE.read_text() == f"1 pause {_end_in(10)} 1\n"
+
+
+def test_named_timers_not_in_prompt(cli: Cli) -> None:
+    cli("-t alice next")
+    assert not DEFAULT_PROMPT_FILE.exists()
+
+
+def test_prompt_status_duration_options(cli: Cli) -> None:
+    assert cli("next -w 50") == "1/4 Work: 50:00\n"
+    assert DEFAULT_PROMPT_FILE.read_text() == f"1 work {_end_in(50)} 1\n"
@@ -0,0 +1,77 @@
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from conftest import Cli
+from pyfakefs.fake_filesystem import FakeFilesystem
+from pytest import mark
+
+from jtravail.log import LOG_HEADER_V2, format_entry, format_entry_v2
+from jtravail.pomodoro import DEFAULT_LOG_FILE
+from jtravail.report import aggregate_chunk, build_report, split_chunks
+from jtravail.stats import Stats
+
+_ORIGIN = datetime(2023, 1, 1, 9)
+
+
+def _write_log(path: Path, count: int, v2: bool = False) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    format_ = format_entry_v2 if v2 else format_entry
+    with path.open("w") as log:
+        if v2:
+            log.write(LOG_HEADER_V2.decode())
+        for index in range(count):
+            start = _ORIGIN + timedelta(hours=index)
+            log.write(format_(start, start + timedelta(minutes=25), "work") + "\n")
+
+
+def _summary(days: dict[date, Stats]) -> list[tuple[date, int, timedelta]]:
+    return [(day, stats.pomodoros, stats.work_time) for day, stats in days.items()]
+
+
+@mark.parametrize("v2", [False, True])
+@mark.parametrize("count", [1, 7, 100])
+def test_split_chunks(cli: Cli, v2: bool, count: int) -> None:
+    _write_log(DEFAULT_LOG_FILE, 100, v2)
+    expected = _summary(aggregate_chunk(DEFAULT_LOG_FILE, 0, 1 << 30))
+    assert sum(day[1] for day in expected) == 100
+
+    chunks = split_chunks(DEFAULT_LOG_FILE, count)
+    assert len(chunks) == count
+    pomodoros = sum(
+        stats.pomodoros
+        for start, end in chunks
+        for stats in aggregate_chunk(DEFAULT_LOG_FILE, start, end).values()
+    )
+    assert pomodoros == 100
+
+
+def test_build_report_in_parallel(cli: Cli, fs: FakeFilesystem) -> None:
+    fs.pause()
+    try:
+        with TemporaryDirectory() as directory:
+            paths = [Path(directory) / "laptop.db", Path(directory) / "desktop.db"]
+            _write_log(paths[0], 500)
+            _write_log(paths[1], 300, v2=True)
+
+            serial = build_report(paths, jobs=1)
+            parallel = build_report(paths, jobs=3, min_parallel_size=0)
+    finally:
+        fs.resume()
+
+    assert _summary(parallel) == _summary(serial)
+    assert sum(stats.pomodoros for stats in parallel.values()) == 800
+
+
+def test_report(cli: Cli) -> None:
+    assert cli("report") == ""
+
+    _write_log(DEFAULT_LOG_FILE, 30)
+    other_log = Path("/exports/other.db")
+    _write_log(other_log, 24, v2=True)
+
+    format_ = "-f '{period} {pomodoros} {work_minutes}'"
+    assert cli(f"report {format_}") == "2023-01-01 15 375\n2023-01-02 15 375\n"
+    assert cli(f"report -p month {format_} {DEFAULT_LOG_FILE} {other_log}") == (
+        "2023-01 54 1350\n"
+    )
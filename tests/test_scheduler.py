@@ -0,0 +1,86 @@
+from asyncio import run, sleep
+
+from conftest import Cli
+
+from jtravail.pomodoro import Pomodoro
+from jtravail.scheduler import PhaseScheduler
+from jtravail.storage import MemoryLog, MemoryState
+
+
+def _pomodoro() -> Pomodoro:
+    return Pomodoro(log=MemoryLog(), state=MemoryState())
+
+
+async def _tick(cli: Cli, seconds: int) -> None:
+    # asyncio only runs timers due strictly before the current time, which
+    # never happens at the exact deadline with a frozen clock: tick past it.
+    cli.tick(seconds)
+    # Due timers run after the current task in the next loop iteration
+    await sleep(0)
+    await sleep(0)
+
+
+def test_phase_end_hooks(cli: Cli) -> None:
+    fired: list[tuple[str, str]] = []
+    scheduler = PhaseScheduler(
+        [lambda name, pomodoro: fired.append((name, pomodoro.status))],
+        work_duration=25,
+        pause_duration=5,
+        long_pause_duration=15,
+    )
+    pomodoros = {name: _pomodoro() for name in ["first", "second", "third"]}
+
+    async def _run() -> None:
+        for name, pomodoro in pomodoros.items():
+            pomodoro.next()
+            scheduler.watch(name, pomodoro)
+            cli.tick(60)
+
+        # Changing phase replaces the previous deadline
+        pomodoros["first"].next()
+        scheduler.watch("first", pomodoros["first"])
+        scheduler.watch("second", pomodoros["second"])
+
+        await _tick(cli, 2 * 60)
+        assert fired == []
+
+        await _tick(cli, 3 * 60 + 1)
+        assert fired == [("first", "pause")]
+
+        await _tick(cli, 18 * 60)
+        assert fired == [("first", "pause"), ("second", "work")]
+
+        await _tick(cli, 60)
+        assert fired == [("first", "pause"), ("second", "work"), ("third", "work")]
+
+        # Already fired phases aren't notified again
+        scheduler.watch("second", pomodoros["second"])
+        scheduler.unwatch("first")
+        await _tick(cli, 60 * 60)
+        assert len(fired) == 3
+        scheduler.close()
+
+    run(_run())
+
+
+def test_many_timers(cli: Cli) -> None:
+    fired: list[str] = []
+    scheduler = PhaseScheduler(
+        [lambda name, _: fired.append(name)],
+        work_duration=25,
+        pause_duration=5,
+        long_pause_duration=15,
+    )
+
+    async def _run() -> None:
+        for index in range(1000):
+            pomodoro = _pomodoro()
+            pomodoro.next()
+            scheduler.watch(f"{999 - index:03d}", pomodoro)
+            cli.tick(1)
+
+        await _tick(cli, 25 * 60)
+        scheduler.close()
+
+    run(_run())
+    assert fired == [f"{999 - index:03d}" for index in range(1000)]
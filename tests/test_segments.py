@@ -0,0 +1,132 @@
+from datetime import date, datetime, timedelta
+from gzip import open as gzip_open
+from json import loads as json_loads
+
+from conftest import Cli
+from freezegun import freeze_time
+from pytest import raises
+
+from jtravail.log import LOG_HEADER_V2
+from jtravail.pomodoro import Pomodoro
+from jtravail.segments import DEFAULT_SEGMENTS_DIR, SegmentedLog
+
+
+def _run_days(cli: Cli, pomodoro: Pomodoro, days: int) -> None:
+    for _ in range(days):
+        pomodoro.next()
+        cli.tick(25 * 60)
+        pomodoro.next()
+        cli.tick(5 * 60)
+        pomodoro.stop()
+        cli.tick(24 * 3600 - 30 * 60)
+
+
+def _manifest() -> list[dict[str, object]]:
+    with (DEFAULT_SEGMENTS_DIR / "manifest.json").open("r") as manifest:
+        segments: list[dict[str, object]] = json_loads(manifest.read())["segments"]
+    return segments
+
+
+def test_segmented_log() -> None:
+    with freeze_time(datetime(2023, 1, 30, 9)) as freezer:
+        cli = Cli(freezer)
+        pomodoro = Pomodoro(SegmentedLog())
+        _run_days(cli, pomodoro, 4)
+
+        assert sorted(path.name for path in DEFAULT_SEGMENTS_DIR.iterdir()) == [
+            "2023-01.log.gz",
+            "2023-02.log",
+            "manifest.json",
+        ]
+        january, february = _manifest()
+        assert january["count"] == 2
+        assert "days" in january
+        assert february["count"] == 2
+        assert "days" not in february
+
+        with gzip_open(DEFAULT_SEGMENTS_DIR / "2023-01.log.gz", "rb") as segment:
+            assert segment.readline() == LOG_HEADER_V2
+
+        with pomodoro.get_log() as entries:
+            assert [entry.start.day for entry in entries] == [30, 31, 1, 2]
+
+        since = datetime(2023, 1, 31)
+        with pomodoro.get_log(since=since, until=since + timedelta(days=1)) as entries:
+            assert [entry.start.day for entry in entries] == [31]
+
+        assert [entry.start.day for entry in pomodoro.get_last_log(3)] == [31, 1, 2]
+        last_entries = pomodoro.get_last_log(10)
+        assert [entry.start.day for entry in last_entries] == [30, 31, 1, 2]
+
+        stats = pomodoro.get_stats()
+        assert list(stats) == [
+            date(2023, 1, 30),
+            date(2023, 1, 31),
+            date(2023, 2, 1),
+            date(2023, 2, 2),
+        ]
+        assert [day.pomodoros for day in stats.values()] == [1, 1, 1, 1]
+
+        # Reading February doesn't open the January segment.
+        (DEFAULT_SEGMENTS_DIR / "2023-01.log.gz").unlink()
+        with pomodoro.get_log(since=datetime(2023, 2, 1)) as entries:
+            assert [entry.start.day for entry in entries] == [1, 2]
+        assert [entry.start.day for entry in pomodoro.get_last_log(2)] == [1, 2]
+
+
+def test_segmented_log_backend_option(cli: Cli) -> None:
+    cli("-b segmented next", "-b segmented next")
+    assert cli("-b segmented history -f '{status}'") == "Work\n"
+    assert [segment["count"] for segment in _manifest()] == [1]
+
+
+def test_segmented_log_lost_manifest() -> None:
+    with freeze_time(datetime(2023, 1, 30, 9)) as freezer:
+        cli = Cli(freezer)
+        pomodoro = Pomodoro(SegmentedLog())
+        _run_days(cli, pomodoro, 4)
+        expected_manifest = _manifest()
+
+        # As left by an interrupted write
+        (DEFAULT_SEGMENTS_DIR / "manifest.json").write_text('{"segm')
+        with pomodoro.get_log() as entries:
+            assert [entry.start.day for entry in entries] == [30, 31, 1, 2]
+
+        _run_days(cli, pomodoro, 1)
+        assert [segment["count"] for segment in _manifest()] == [2, 3]
+        assert _manifest()[0] == expected_manifest[0]
+        with (DEFAULT_SEGMENTS_DIR / "2023-02.log").open("rb") as segment:
+            assert segment.read().count(LOG_HEADER_V2) == 1
+        assert [entry.start.day for entry in pomodoro.get_last_log(10)] == [
+            30,
+            31,
+            1,
+            2,
+            3,
+        ]
+
+        # Only closed segments are left, the new month is started next to them
+        (DEFAULT_SEGMENTS_DIR / "2023-02.log").unlink()
+        (DEFAULT_SEGMENTS_DIR / "manifest.json").unlink()
+        cli.tick(30 * 24 * 3600)
+        _run_days(cli, pomodoro, 1)
+        assert [segment["name"] for segment in _manifest()] == ["2023-01", "2023-03"]
+        assert [entry.start.day for entry in pomodoro.get_last_log(10)] == [
+            30,
+            31,
+            6,
+        ]
+
+
+def test_migrate_segments(cli: Cli) -> None:
+    cli("next", "next")
+    cli.tick(40 * 24 * 3600)
+    cli("next", "next")
+    assert cli("migrate-segments") == (
+        f"Imported 3 sessions into {DEFAULT_SEGMENTS_DIR}\n"
+    )
+    assert [segment["count"] for segment in _manifest()] == [2, 1]
+    assert cli("-b segmented history -f '{status}'") == cli("history -f '{status}'")
+
+    with raises(SystemExit):
+        cli("migrate-segments")
@@ -0,0 +1,52 @@
+from typing import Any
+
+from conftest import Cli
+from pytest import CaptureFixture, MonkeyPatch
+
+from jtravail.pomodoro import DEFAULT_STATE_FILE
+from jtravail.snapshot import DEFAULT_SNAPSHOT_FILE, Snapshot
+from jtravail.status import DEFAULT_CONFIG_FILE, main
+
+
+def _fail(*_: Any) -> Any:
+    raise AssertionError("Snapshot wasn't used")
+
+
+def test_snapshot_cache(
+    cli: Cli, monkeypatch: MonkeyPatch, capsys: CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr("sys.argv", ["jean-travail", "status"])
+
+    with cli.config(format="{status} {minutes}"):
+        cli("next")
+        cli.tick(60)
+        main()
+        assert capsys.readouterr().out == "Work 24\n"
+
+        with monkeypatch.context() as patch:
+            patch.setattr("jtravail.storage.json_loads", _fail)
+            patch.setattr("jtravail.snapshot.read_config", _fail)
+            main()
+            assert capsys.readouterr().out == "Work 24\n"
+
+    cli("next")
+    cli.tick(60)
+    main()
+    assert capsys.readouterr().out == "1/4 Pause: 04:00\n"
+
+
+def test_snapshot_racy_file(cli: Cli) -> None:
+    snapshot = Snapshot(DEFAULT_STATE_FILE, DEFAULT_CONFIG_FILE)
+    with cli.config(format="first"):
+        assert snapshot.get_config() == {"format": "first"}
+
+        # Same size and modification time, only trusted once the clock moved
+        with DEFAULT_CONFIG_FILE.open("w") as config_file:
+            config_file.write("[options]\nformat=other\n")
+        assert snapshot.get_config() == {"format": "other"}
+
+
+def test_corrupted_snapshot(cli: Cli) -> None:
+    cli("next")
+    DEFAULT_SNAPSHOT_FILE.write_bytes(b"garbage")
+    assert cli("status") == "1/4 Work: 25:00\n"
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlite3 import connect
+from tempfile import TemporaryDirectory
+
+from conftest import Cli
+from pyfakefs.fake_filesystem import FakeFilesystem
+from pytest import raises
+
+from jtravail.pomodoro import DEFAULT_LOG_FILE, Pomodoro
+from jtravail.sqlite import SqliteLog
+
+
+def _write_log(count: int) -> None:
+    DEFAULT_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with DEFAULT_LOG_FILE.open("w") as log:
+        for index in range(count):
+            start = datetime(2023, 1, 1) + timedelta(hours=index)
+            end = start + timedelta(minutes=25)
+            log.write(f"{start.isoformat()};{end.isoformat()};work\n")
+
+
+def test_sqlite_log(cli: Cli) -> None:
+    log = SqliteLog(Path(":memory:"))
+    pomodoro = Pomodoro(log)
+    start = datetime.now()
+
+    pomodoro.next()
+    cli.tick(25 * 60)
+    pomodoro.next()
+    cli.tick(5 * 60)
+    pomodoro.next()
+    cli.tick(60)
+    pomodoro.next()
+
+    with pomodoro.get_log() as entries:
+        assert [entry.type for entry in entries] == ["work", "pause", "work"]
+
+    since = start + timedelta(minutes=27)
+    with pomodoro.get_log(since=since) as entries:
+        assert [entry.duration for entry in entries] == [
+            timedelta(minutes=5),
+            timedelta(minutes=1),
+        ]
+
+    with pomodoro.get_log(until=since) as entries:
+        assert [entry.type for entry in entries] == ["work", "pause"]
+
+    assert [entry.type for entry in pomodoro.get_last_log(2)] == ["pause", "work"]
+
+    (stats,) = pomodoro.get_stats().values()
+    assert stats.pomodoros == 2
+    assert stats.work_time == timedelta(minutes=26)
+    assert stats.pause_time == timedelta(minutes=5)
+
+    assert not DEFAULT_LOG_FILE.exists()
+
+
+def test_migrate(cli: Cli) -> None:
+    _write_log(3)
+    assert cli("migrate -d :memory:") == "Imported 3 sessions into :memory:\n"
+
+
+def test_migrate_to_existing_database(cli: Cli, fs: FakeFilesystem) -> None:
+    _write_log(1000)
+    with DEFAULT_LOG_FILE.open("r") as log:
+        content = log.read()
+
+    fs.pause()
+    try:
+        with TemporaryDirectory() as directory:
+            source = Path(directory) / "log.db"
+            destination = Path(directory) / "log.sqlite"
+            with source.open("w") as log:
+                log.write(content)
+
+            assert cli(f"migrate -s {source} -d {destination}") == (
+                f"Imported 1000 sessions into {destination}\n"
+            )
+
+            with raises(SystemExit):
+                cli(f"migrate -s {source} -d {destination}")
+
+            with connect(destination) as connection:
+                ((journal_mode,),) = connection.execute("PRAGMA journal_mode")
+                ((count,),) = connection.execute("SELECT count(*) FROM log")
+            assert journal_mode == "wal"
+            assert count == 1000
+    finally:
+        fs.resume()
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from json import loads as json_loads
+
+from conftest import Cli
+from freezegun import freeze_time
+from pytest import raises
+
+from jtravail.pomodoro import DEFAULT_LOG_FILE, DEFAULT_ROLLUP_FILE, Pomodoro
+
+_FORMAT = "-f '{period} {pomodoros} {work_minutes} {pause_minutes}'"
+
+
+def _work_day(cli: Cli, pomodoros: int) -> None:
+    for _ in range(pomodoros):
+        cli("next")
+        cli.tick(25 * 60)
+        cli("next")
+        cli.tick(5 * 60)
+    cli("stop")
+
+
+def test_stats() -> None:
+    with freeze_time(datetime(2023, 1, 30, 9)) as freezer:
+        cli = Cli(freezer)
+        assert cli("stats") == ""
+
+        _work_day(cli, 2)
+        cli.tick(24 * 3600)
+        _work_day(cli, 3)
+        cli.tick(24 * 3600)
+        _work_day(cli, 1)
+
+        assert cli(f"stats {_FORMAT}") == (
+            "2023-01-30 2 50 5\n" + "2023-01-31 3 75 10\n" + "2023-02-01 1 25 0\n"
+        )
+        assert cli(f"stats -n 1 {_FORMAT}") == "2023-02-01 1 25 0\n"
+        assert cli(f"stats -p week {_FORMAT}") == "2023-W05 6 150 15\n"
+        assert cli(f"stats -p month {_FORMAT}") == (
+            "2023-01 5 125 15\n" + "2023-02 1 25 0\n"
+        )
+
+
+def test_rollup_is_updated_on_log_append(cli: Cli) -> None:
+    _work_day(cli, 2)
+
+    with DEFAULT_ROLLUP_FILE.open("r") as rollup_file:
+        rollup = json_loads(rollup_file.read())
+
+    assert rollup["offset"] == DEFAULT_LOG_FILE.stat().st_size
+    assert [stats[2] for stats in rollup["days"].values()] == [2]
+
+
+def test_rollup_rebuild(cli: Cli) -> None:
+    _work_day(cli, 2)
+
+    DEFAULT_ROLLUP_FILE.unlink()
+    assert [stats.pomodoros for stats in Pomodoro().get_stats().values()] == [2]
+
+    with DEFAULT_ROLLUP_FILE.open("w") as rollup_file:
+        rollup_file.write("not json")
+    assert [stats.pomodoros for stats in Pomodoro().get_stats().values()] == [2]
+
+    start = datetime.now() - timedelta(hours=1)
+    with DEFAULT_LOG_FILE.open("w") as log:
+        log.write(f"{start.isoformat()};{datetime.now().isoformat()};work\n")
+    assert [stats.pomodoros for stats in Pomodoro().get_stats().values()] == [1]
+
+    DEFAULT_LOG_FILE.unlink()
+    assert Pomodoro().get_stats() == {}
+
+
+def test_stats_negative_last(cli: Cli) -> None:
+    _work_day(cli, 1)
+    assert cli(f"stats -n 0 {_FORMAT}") == ""
+    with raises(SystemExit):
+        cli("stats -n -1")
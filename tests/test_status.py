@@ -1,4 +1,10 @@
+from datetime import datetime, timedelta
+
 from conftest import Cli
+from pytest import CaptureFixture, MonkeyPatch, raises
+
+from jtravail.pomodoro import Pomodoro
+from jtravail.status import FormatError, StatusFormat, main
 
 
 def test_status(cli: Cli) -> None:
@@ -35,3 +41,66 @@ def test_format_parameter_substitutions(cli: Cli) -> None:
     assert cli("status -f '{total_seconds}'") == "300\n"
     assert cli("status -f '{iteration}'") == "1\n"
     assert cli("status -f '{long_pause_period}'") == "4\n"
+
+    cli.tick(60)
+    assert cli("status -f '{progress}'") == "20\n"
+    assert cli("status -f '{end:%H:%M}'") == (
+        datetime.now() + timedelta(minutes=4)
+    ).strftime("%H:%M\n")
+
+
+def test_invalid_format(cli: Cli) -> None:
+    for format_ in ["{unknown}", "{status:02d}", "{status", "{}"]:
+        with raises(SystemExit):
+            cli(f"status -f '{format_}'")
+
+    with raises(FormatError):
+        StatusFormat("{minutes:s}")
+
+    # The pomodoro isn't started when the format is invalid
+    with raises(SystemExit):
+        cli("next -f '{unknown}'")
+    assert cli("status") == "1/4 Idle: 00:00\n"
+
+
+def test_follow(cli: Cli, monkeypatch: MonkeyPatch) -> None:
+    sleeps: list[float] = []
+
+    def _sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        if len(sleeps) == 4:
+            raise KeyboardInterrupt()
+        cli.tick(1)
+        if len(sleeps) == 3:
+            Pomodoro().next()
+
+    monkeypatch.setattr("jtravail.cli.sleep", _sleep)
+    monkeypatch.setattr("jtravail.cli.time", lambda: 1000.25)
+
+    cli("next")
+    assert cli("status --follow") == (
+        "1/4 Work: 25:00\n"
+        + "1/4 Work: 24:59\n"
+        + "1/4 Work: 24:58\n"
+        + "1/4 Pause: 05:00\n"
+    )
+    assert sleeps == [0.75] * 4
+
+
+def test_fast_path(
+    cli: Cli, monkeypatch: MonkeyPatch, capsys: CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr("sys.argv", ["jean-travail", "status"])
+
+    cli("next")
+    cli.tick(67)
+    main()
+    assert capsys.readouterr().out == "1/4 Work: 23:53\n"
+
+    with cli.config(work_duration="30", format="{status} {minutes}"):
+        main()
+        assert capsys.readouterr().out == "Work 28\n"
+
+        with cli.environment(JTRAVAIL_WORK_DURATION="40"):
+            main()
+            assert capsys.readouterr().out == "Work 38\n"
@@ -0,0 +1,82 @@
+from conftest import Cli
+
+from jtravail.pomodoro import (
+    DEFAULT_LOG_FILE,
+    DEFAULT_ROLLUP_FILE,
+    DEFAULT_STATE_FILE,
+    Pomodoro,
+)
+from jtravail.storage import (
+    BatchedLog,
+    BatchedState,
+    FileState,
+    MemoryLog,
+    MemoryState,
+    TextLog,
+)
+
+
+def _run(cli: Cli, pomodoro: Pomodoro) -> None:
+    pomodoro.next()
+    cli.tick(25 * 60)
+    pomodoro.next()
+    cli.tick(5 * 60)
+    pomodoro.next()
+
+
+def test_memory_storage(cli: Cli) -> None:
+    state = MemoryState()
+    pomodoro = Pomodoro(log=MemoryLog(), state=state)
+    _run(cli, pomodoro)
+
+    assert pomodoro.work
+    assert pomodoro.iteration == 2
+    with pomodoro.get_log() as entries:
+        assert [entry.type for entry in entries] == ["work", "pause"]
+    assert [entry.type for entry in pomodoro.get_last_log(1)] == ["pause"]
+    assert [stats.pomodoros for stats in pomodoro.get_stats().values()] == [1]
+
+    other = Pomodoro(log=MemoryLog(), state=state)
+    assert other.work
+    other.stop()
+    assert pomodoro.reload()
+    assert pomodoro.idle
+
+    assert not DEFAULT_STATE_FILE.exists()
+    assert not DEFAULT_LOG_FILE.exists()
+
+
+def test_batched_storage(cli: Cli) -> None:
+    cli("next", "next")
+    cli.tick(5 * 60)
+
+    pomodoro = Pomodoro(
+        log=BatchedLog(TextLog(DEFAULT_LOG_FILE, DEFAULT_ROLLUP_FILE)),
+        state=BatchedState(FileState(DEFAULT_STATE_FILE)),
+    )
+    assert pomodoro.pause
+    state_stamp = DEFAULT_STATE_FILE.stat().st_mtime_ns
+    log_size = DEFAULT_LOG_FILE.stat().st_size
+
+    _run(cli, pomodoro)
+    assert pomodoro.work
+    with pomodoro.get_log() as entries:
+        assert [entry.type for entry in entries] == ["work", "pause", "work", "pause"]
+    assert [entry.type for entry in pomodoro.get_last_log(3)] == [
+        "pause",
+        "work",
+        "pause",
+    ]
+    assert [stats.pomodoros for stats in pomodoro.get_stats().values()] == [2]
+
+    assert DEFAULT_STATE_FILE.stat().st_mtime_ns == state_stamp
+    assert DEFAULT_LOG_FILE.stat().st_size == log_size
+    assert cli("status") == "1/4 Pause: -30:00\n"
+
+    pomodoro.flush()
+    assert cli("status") == "3/4 Work: 25:00\n"
+    assert cli("history -f '{status}'") == "Work\nPause\nWork\nPause\n"
+
+    pomodoro.stop()
+    pomodoro.flush()
+    assert not DEFAULT_STATE_FILE.exists()
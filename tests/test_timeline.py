@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta
+from typing import Iterator
+
+from conftest import Cli
+from pytest import FixtureRequest, MonkeyPatch, fixture, raises
+
+from jtravail.storage import MemoryLog
+from jtravail.timeline import Timeline
+
+_ORIGIN = datetime(2023, 3, 1, 9)
+
+
+@fixture(params=["numpy", "array"], autouse=True)
+def backend(request: FixtureRequest, monkeypatch: MonkeyPatch) -> Iterator[None]:
+    if request.param == "array":
+        monkeypatch.setattr("jtravail.timeline.numpy", None)
+    yield
+
+
+def _timeline(days: int) -> Timeline:
+    log = MemoryLog()
+    for day in range(days):
+        start = _ORIGIN + timedelta(days=day)
+        for _ in range(day + 1):
+            log.append(start, start + timedelta(minutes=25), "work")
+            start += timedelta(minutes=25)
+            log.append(start, start + timedelta(minutes=5), "pause")
+            start += timedelta(minutes=5)
+
+    with log.read() as entries:
+        return Timeline.from_entries(entries)
+
+
+def test_timeline_rows(cli: Cli) -> None:
+    timeline = _timeline(2)
+    assert len(timeline) == 6
+    assert timeline.type_names == ["work", "pause"]
+
+    entry = timeline[1]
+    assert entry.start == _ORIGIN + timedelta(minutes=25)
+    assert entry.end == _ORIGIN + timedelta(minutes=30)
+    assert entry.duration == timedelta(minutes=5)
+    assert entry.type == "pause"
+    assert timeline[-1].type == "pause"
+
+    with raises(IndexError):
+        timeline[6]
+
+    assert [entry.type for entry in timeline] == ["work", "pause"] * 3
+
+
+def test_timeline_columns(cli: Cli) -> None:
+    timeline = _timeline(3)
+
+    assert list(timeline.durations()) == [1500.0, 300.0] * 6
+    assert timeline.total_duration() == timedelta(minutes=180)
+    assert timeline.total_duration("work") == timedelta(minutes=150)
+    assert timeline.total_duration("long-pause") == timedelta(0)
+
+    work = timeline.filter(type_="work")
+    assert len(work) == 6
+    assert {entry.type for entry in work} == {"work"}
+
+    second_day = timeline.filter(
+        since=_ORIGIN + timedelta(days=1), until=_ORIGIN + timedelta(days=2)
+    )
+    assert len(second_day) == 4
+    assert second_day[0].start == _ORIGIN + timedelta(days=1)
+
+    stats = timeline.get_stats()
+    assert list(stats) == [date(2023, 3, 1), date(2023, 3, 2), date(2023, 3, 3)]
+    assert [day.pomodoros for day in stats.values()] == [1, 2, 3]
+    assert [day.pause_time for day in stats.values()] == [
+        timedelta(minutes=5),
+        timedelta(minutes=10),
+        timedelta(minutes=15),
+    ]
+
+
+def test_timeline_stats_gaps(cli: Cli) -> None:
+    timeline = Timeline()
+    later = _ORIGIN + timedelta(days=3)
+    timeline.append(later, later + timedelta(minutes=25), "work")
+    timeline.append(_ORIGIN, _ORIGIN + timedelta(minutes=15), "long-pause")
+
+    stats = timeline.get_stats()
+    assert sorted(stats) == [date(2023, 3, 1), date(2023, 3, 4)]
+    assert stats[date(2023, 3, 1)].pomodoros == 0
+    assert stats[date(2023, 3, 1)].pause_time == timedelta(0)
+    assert stats[date(2023, 3, 4)].work_time == timedelta(minutes=25)
+    assert Timeline().get_stats() == {}
+
+
+def test_timeline_many_types(cli: Cli) -> None:
+    timeline = Timeline()
+    for index in range(300):
+        timeline.append(_ORIGIN, _ORIGIN + timedelta(minutes=1), f"type-{index}")
+
+    assert timeline[-1].type == "type-299"
+    assert len(timeline.filter(type_="type-299")) == 1
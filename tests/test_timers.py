@@ -0,0 +1,104 @@
+from datetime import datetime
+
+from conftest import Cli
+from pytest import CaptureFixture, MonkeyPatch, raises
+
+from jtravail.status import main
+from jtravail.timers import DEFAULT_TIMERS_FILE, TimerStore
+
+
+def test_named_timers(cli: Cli) -> None:
+    assert cli("--timer alice next") == "1/4 Work: 25:00\n"
+    cli.tick(60)
+    assert cli("-t bob next", "-t bob next") == "1/4 Pause: 05:00\n"
+
+    assert cli("status") == "1/4 Idle: 00:00\n"
+    assert cli("-t alice status") == "1/4 Work: 24:00\n"
+    assert cli("status --all") == "alice: 1/4 Work: 24:00\nbob: 1/4 Pause: 05:00\n"
+
+    cli("-t alice stop")
+    assert cli("status --all -f '{status}'") == "bob: Pause\n"
+
+
+def test_timer_fast_path(
+    cli: Cli, monkeypatch: MonkeyPatch, capsys: CaptureFixture[str]
+) -> None:
+    cli("--timer alice next")
+    monkeypatch.setattr("sys.argv", ["jean-travail", "status"])
+    with cli.environment(JTRAVAIL_TIMER="alice"), raises(SystemExit):
+        main()
+    assert capsys.readouterr().out == "1/4 Work: 25:00\n"
+
+
+def test_timer_store(cli: Cli) -> None:
+    store = TimerStore()
+    start_time = datetime(2023, 6, 1, 12, 30, 15, 123456).isoformat()
+    for index in range(1000):
+        store.set(
+            f"timer-{index:04d}",
+            {"status": "work", "start_time": start_time, "iteration": index},
+        )
+    store.remove("timer-0010")
+    store.remove("timer-0999")
+    store.set("timer-0020", {"status": "idle", "start_time": None, "iteration": 1})
+
+    loaded = TimerStore()
+    loaded.refresh()
+    assert len(loaded.names) == 998
+    assert "timer-0010" not in loaded.names
+    assert loaded.get("timer-0010") is None
+    assert loaded.get("timer-0998") == {
+        "status": "work",
+        "start_time": start_time,
+        "iteration": 998,
+    }
+    assert loaded.get("timer-0020") == {
+        "status": "idle",
+        "start_time": None,
+        "iteration": 1,
+    }
+
+
+def test_invalid_timers_file(cli: Cli) -> None:
+    DEFAULT_TIMERS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    DEFAULT_TIMERS_FILE.write_bytes(b"garbage")
+
+    assert cli("-t alice next") == (
+        f"Invalid timers file {DEFAULT_TIMERS_FILE}: marshal data too short. "
+        + "Timers were reset.\n1/4 Work: 25:00\n"
+    )
+    assert cli("status --all") == "alice: 1/4 Work: 25:00\n"
+
+
+def test_invalid_timers_file_all(cli: Cli) -> None:
+    cli("-t alice next")
+    DEFAULT_TIMERS_FILE.write_bytes(b"garbage")
+
+    assert cli("status --all") == (
+        f"Invalid timers file {DEFAULT_TIMERS_FILE}: marshal data too short. "
+        + "Timers were reset.\n"
+    )
+
+
+def test_timer_store_same_size_writes(cli: Cli) -> None:
+    first = TimerStore()
+    second = TimerStore()
+    start_time = datetime(2023, 6, 1, 12).isoformat()
+    first.set("alice", {"status": "work", "start_time": start_time, "iteration": 1})
+    second.set("bob", {"status": "work", "start_time": start_time, "iteration": 1})
+
+    # Same size and time as the previous write
+    first.set("alice", {"status": "work", "start_time": start_time, "iteration": 2})
+    second.set("bob", {"status": "work", "start_time": start_time, "iteration": 2})
+
+    store = TimerStore()
+    store.refresh()
+    assert (
+        store.get("alice")
+        == store.get("bob")
+        == {
+            "status": "work",
+            "start_time": start_time,
+            "iteration": 2,
+        }
+    )
@@ -0,0 +1,69 @@
+from json import load as json_load
+from pathlib import Path
+
+from conftest import Cli
+from pytest import CaptureFixture, MonkeyPatch
+
+from jtravail.status import main
+from jtravail.trace import is_tracing, trace
+
+
+def test_trace_disabled(cli: Cli) -> None:
+    assert "trace:" not in cli("next")
+    assert not is_tracing()
+    assert trace("first") is trace("second")
+
+
+def test_trace_stderr(cli: Cli) -> None:
+    cli("next")
+    lines = cli("--trace next").splitlines()
+    assert lines[0] == "1/4 Pause: 05:00"
+    assert [line.split(":")[1] for line in lines[1:]] == [
+        " imports",
+        " state load",
+        " config",
+        " command",
+        "   log append",
+        "   state save",
+        "   render",
+    ]
+    assert not is_tracing()
+
+
+def test_trace_file(cli: Cli) -> None:
+    trace_path = Path("/trace.json")
+    assert cli(f"--trace-file {trace_path} status") == "1/4 Idle: 00:00\n"
+
+    with trace_path.open("r") as trace_file:
+        events = json_load(trace_file)["traceEvents"]
+    assert [event["name"] for event in events] == [
+        "imports",
+        "state load",
+        "config",
+        "command",
+        "render",
+    ]
+    assert all(event["dur"] >= 0 for event in events)
+
+
+def test_profile(cli: Cli) -> None:
+    cli("--profile /profile.prof next")
+    assert Path("/profile.prof").stat().st_size > 0
+
+
+def test_trace_fast_path(
+    cli: Cli, monkeypatch: MonkeyPatch, capsys: CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr("sys.argv", ["jean-travail", "status"])
+    with cli.environment(JTRAVAIL_TRACE="1"):
+        main()
+
+    captured = capsys.readouterr()
+    assert captured.out == "1/4 Idle: 00:00\n"
+    assert [line.split(":")[1] for line in captured.err.splitlines()] == [
+        " imports",
+        " config",
+        " command",
+        "   state load",
+        " render",
+    ]